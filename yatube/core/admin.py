@@ -0,0 +1,20 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'name',
+        'status',
+        'priority',
+        'run_at',
+        'attempts',
+    )
+    list_filter = ('status', 'name')
+    readonly_fields = ('error',)
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(Job, JobAdmin)
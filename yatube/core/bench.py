@@ -0,0 +1,42 @@
+"""
+Helpers shared by the ``bench_*`` management commands.
+
+The commands create their data in a transaction that is always rolled
+back, so a benchmark leaves the database as it found it.
+"""
+from contextlib import contextmanager
+from copy import deepcopy
+
+from django.conf import settings
+from django.db import transaction
+
+# The loaders of Django, without the minification of core.loaders.
+STOCK_TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """Run the block in a transaction that is rolled back at the end."""
+    try:
+        with transaction.atomic():
+            yield
+            raise Rollback
+    except Rollback:
+        pass
+
+
+def templates_setting(loaders, cached=True):
+    """Return TEMPLATES with ``loaders``, wrapped in the cached loader."""
+    templates = deepcopy(settings.TEMPLATES)
+    templates[0]['OPTIONS']['loaders'] = (
+        [('django.template.loaders.cached.Loader', loaders)]
+        if cached else loaders
+    )
+    return templates
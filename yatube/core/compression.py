@@ -0,0 +1,116 @@
+"""
+Compression of the responses.
+
+Text responses of COMPRESS_MIN_SIZE bytes and more are compressed with
+gzip. Brotli is used instead when the client accepts it and the optional
+``brotli`` package, which is not in the requirements, is installed.
+Streaming responses are compressed chunk by chunk, each chunk flushed so
+the client gets it at once. The levels are lower than for the static
+files, which are compressed once by ``collectstatic``: these responses
+are compressed on every request.
+"""
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .staticfiles import accepted_encodings, brotli
+
+COMPRESSIBLE_TYPES = (
+    'text/html', 'text/plain', 'text/css', 'text/javascript',
+    'application/javascript', 'application/json', 'application/xml',
+    'text/xml', 'image/svg+xml',
+)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+class GzipCompressor:
+    encoding = 'gzip'
+
+    def __init__(self):
+        self._compressor = zlib.compressobj(
+            GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS
+        )
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    encoding = 'br'
+
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def get_compressor(request):
+    """Return a compressor for the encoding the client prefers, or None."""
+    accepted = accepted_encodings(request)
+    if brotli is not None and 'br' in accepted:
+        return BrotliCompressor()
+    if 'gzip' in accepted:
+        return GzipCompressor()
+    return None
+
+
+def _compress_stream(content, compressor):
+    for chunk in content:
+        data = compressor.compress(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        content_type = response.get('Content-Type', '').split(';')[0]
+        if (
+            response.has_header('Content-Encoding')
+            or content_type.strip() not in COMPRESSIBLE_TYPES
+            or not response.streaming
+            and len(response.content) < settings.COMPRESS_MIN_SIZE
+        ):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressor = get_compressor(request)
+        if compressor is None:
+            return response
+        if response.streaming:
+            response.streaming_content = _compress_stream(
+                response.streaming_content, compressor
+            )
+            del response['Content-Length']
+        else:
+            compressed = (
+                compressor.compress(response.content) + compressor.finish()
+            )
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        # The ETag was computed for the uncompressed content.
+        etag = response.get('ETag', '')
+        if etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        response['Content-Encoding'] = compressor.encoding
+        return response
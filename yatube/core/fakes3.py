@@ -0,0 +1,139 @@
+"""
+Small S3-compatible server for development and tests.
+
+Implements the object calls used by ``core.storage.S3Storage`` (PUT, GET,
+HEAD and DELETE with path-style addressing) and checks their Signature
+Version 4. Objects are kept in memory or under ``root``. Run it with
+``python manage.py runfakes3``.
+"""
+import datetime
+import hashlib
+import os
+import threading
+from urllib.parse import unquote
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+from .storage import sign_request
+
+
+class FakeS3:
+    def __init__(self, access_key, secret_key, region='us-east-1',
+                 root=None):
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.root = root
+        self.objects = {}
+        self.lock = threading.Lock()
+
+    def _signature_is_valid(self, environ, path, body):
+        authorization = environ.get('HTTP_AUTHORIZATION', '')
+        try:
+            fields = dict(
+                part.strip().split('=', 1)
+                for part in authorization.split(' ', 1)[1].split(',')
+            )
+            signed = fields['SignedHeaders'].split(';')
+            now = datetime.datetime.strptime(
+                environ['HTTP_X_AMZ_DATE'], '%Y%m%dT%H%M%SZ'
+            )
+        except (IndexError, KeyError, ValueError):
+            return False
+        headers = {}
+        for name in signed:
+            key = name.upper().replace('-', '_')
+            if key in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                headers[name] = environ.get(key, '')
+            else:
+                headers[name] = environ.get(f'HTTP_{key}', '')
+        payload_hash = hashlib.sha256(body).hexdigest()
+        if environ.get('HTTP_X_AMZ_CONTENT_SHA256') != payload_hash:
+            return False
+        expected = sign_request(
+            environ['REQUEST_METHOD'], environ['PATH_INFO_RAW'], {},
+            {name: value for name, value in headers.items()
+             if name not in ('x-amz-date', 'x-amz-content-sha256')},
+            payload_hash, self.access_key, self.secret_key, self.region,
+            now=now
+        )['Authorization']
+        return expected == authorization
+
+    def _load(self, path):
+        if self.root is None:
+            return self.objects.get(path)
+        filename = os.path.join(self.root, path.lstrip('/'))
+        if not os.path.isfile(filename):
+            return None
+        with open(filename, 'rb') as file:
+            return file.read(), self.objects.get(path, ({}, {}))[1]
+
+    def _store(self, path, body, headers):
+        if self.root is None:
+            self.objects[path] = (body, headers)
+            return
+        filename = os.path.join(self.root, path.lstrip('/'))
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, 'wb') as file:
+            file.write(body)
+        self.objects[path] = (None, headers)
+
+    def _remove(self, path):
+        self.objects.pop(path, None)
+        if self.root is not None:
+            filename = os.path.join(self.root, path.lstrip('/'))
+            if os.path.isfile(filename):
+                os.remove(filename)
+
+    def __call__(self, environ, start_response):
+        method = environ['REQUEST_METHOD']
+        raw_path = environ.get('RAW_URI', environ['PATH_INFO'])
+        environ['PATH_INFO_RAW'] = raw_path.split('?', 1)[0]
+        path = unquote(environ['PATH_INFO_RAW'])
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        body = environ['wsgi.input'].read(length) if length else b''
+        if not self._signature_is_valid(environ, path, body):
+            start_response('403 Forbidden', [])
+            return [b'SignatureDoesNotMatch']
+        with self.lock:
+            if method == 'PUT':
+                self._store(path, body, {
+                    'Content-Type': environ.get('CONTENT_TYPE', ''),
+                    'Cache-Control': environ.get('HTTP_CACHE_CONTROL', ''),
+                })
+                start_response('200 OK', [('Content-Length', '0')])
+                return [b'']
+            if method == 'DELETE':
+                self._remove(path)
+                start_response('204 No Content', [])
+                return [b'']
+            stored = self._load(path)
+        if stored is None:
+            start_response('404 Not Found', [('Content-Length', '0')])
+            return [b'']
+        data, headers = stored
+        start_response('200 OK', [
+            ('Content-Length', str(len(data))),
+            *((name, value) for name, value in headers.items() if value),
+        ])
+        return [b''] if method == 'HEAD' else [data]
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def get_environ(self):
+        environ = super().get_environ()
+        environ['RAW_URI'] = self.path
+        return environ
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_fake_server(app, host='127.0.0.1', port=0):
+    return make_server(host, port, app, handler_class=_QuietHandler)
+
+
+def serve(app, host='127.0.0.1', port=0):
+    """Start the server in a daemon thread and return it."""
+    server = make_fake_server(app, host, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
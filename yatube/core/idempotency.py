@@ -0,0 +1,92 @@
+"""
+Duplicate-submit protection for the write endpoints.
+
+Forms carry a random key in a hidden field (``{% idempotency_key %}``),
+API clients may send it in the ``Idempotency-Key`` header. The first
+request with a key claims it in the cache with ``add``; when the view
+answers with a redirect, the redirect is stored under the key for
+IDEMPOTENCY_TIMEOUT seconds and replays of the request get it back
+without running the view. A replay that arrives while the first request
+is still running waits IDEMPOTENCY_WAIT seconds for its result and then
+gets a 409 asking to retry; the view never runs twice at the same time.
+The claim is held for IDEMPOTENCY_PENDING_TIMEOUT, longer than a request
+can run, and holds a token of its request, so only the request that made
+the claim releases it.
+"""
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponseRedirect
+
+from .views import conflict
+
+FIELD_NAME = 'idempotency_key'
+HEADER_NAME = 'HTTP_IDEMPOTENCY_KEY'
+PENDING = 'pending:'
+WAIT_INTERVAL = 0.05
+
+
+def new_key():
+    return uuid.uuid4().hex
+
+
+def request_key(request):
+    key = request.META.get(HEADER_NAME) or request.POST.get(FIELD_NAME)
+    if not key or len(key) > 64:
+        return None
+    return key
+
+
+def _is_pending(value):
+    return isinstance(value, str) and value.startswith(PENDING)
+
+
+def _wait(cache_key):
+    """
+    Return the stored redirect, None when the claim was released without
+    one, or the claim itself when the request still runs.
+    """
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT
+    value = cache.get(cache_key)
+    while _is_pending(value) and time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        value = cache.get(cache_key)
+    return value
+
+
+def idempotent(view):
+    """Answer replays of a POST with the redirect of the first request."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request_key(request) if request.method == 'POST' else None
+        if key is None:
+            return view(request, *args, **kwargs)
+        cache_key = f'idem:{view.__name__}:{request.user.pk}:{key}'
+        claim = PENDING + new_key()
+        timeout = settings.IDEMPOTENCY_PENDING_TIMEOUT
+        if not cache.add(cache_key, claim, timeout):
+            location = _wait(cache_key)
+            if _is_pending(location):
+                return conflict(request, settings.IDEMPOTENCY_WAIT)
+            if location:
+                return HttpResponseRedirect(location)
+            # The first request failed and released the key: run again.
+            if not cache.add(cache_key, claim, timeout):
+                return conflict(request, settings.IDEMPOTENCY_WAIT)
+        stored = False
+        try:
+            response = view(request, *args, **kwargs)
+            if isinstance(response, HttpResponseRedirect):
+                cache.set(
+                    cache_key, response.url, settings.IDEMPOTENCY_TIMEOUT
+                )
+                stored = True
+            return response
+        finally:
+            if not stored and cache.get(cache_key) == claim:
+                # Invalid forms and errors may be submitted again.
+                cache.delete(cache_key)
+    return wrapper
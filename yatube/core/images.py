@@ -0,0 +1,35 @@
+"""
+Inline preview of uploaded images.
+
+The preview is a JPEG of at most PLACEHOLDER_SIZE pixels a side, a few
+hundred bytes as a data URI. Pages show it stretched under the image
+while the image loads, so the reader sees the colours of the picture
+before its bytes arrive; the size of the thumbnail keeps the layout.
+"""
+import base64
+import io
+
+from PIL import Image, ImageOps
+
+PLACEHOLDER_SIZE = 24
+PLACEHOLDER_QUALITY = 40
+
+
+def image_preview(file):
+    """
+    Return a data URI of the preview of the image as displayed, after the
+    EXIF orientation. The file is rewound.
+    """
+    file.seek(0)
+    try:
+        with Image.open(file) as image:
+            # JPEGs are decoded at a fraction of their size, much faster.
+            image.draft('RGB', (PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+            image = ImageOps.exif_transpose(image).convert('RGB')
+            image.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+            buffer = io.BytesIO()
+            image.save(buffer, 'JPEG', quality=PLACEHOLDER_QUALITY)
+    finally:
+        file.seek(0)
+    data = base64.b64encode(buffer.getvalue()).decode()
+    return f'data:image/jpeg;base64,{data}'
@@ -0,0 +1,70 @@
+"""
+Template loader that strips the indentation of the HTML templates.
+
+The source of a ``.html`` template of TEMPLATES_DIR is minified when it is
+loaded, before it is compiled, so with the cached loader it happens once
+per worker and rendering costs nothing extra. Whitespace around a line
+break is reduced to the line break and lines holding only a block or
+control tag, such as ``{% if %}`` or ``{% endfor %}``, or a comment are
+joined with the next one; tags that output text keep their line break.
+The contents of ``<pre>`` and ``<textarea>`` are kept as they are. A line
+break is left wherever there was whitespace, so inline elements and
+scripts render exactly as before.
+
+Templates of the apps and of letters, which are plain text whatever their
+extension, are loaded as they are.
+"""
+import os
+import re
+
+from django.conf import settings
+from django.template.loaders import filesystem
+
+# Tags that output nothing by themselves.
+JOINED_TAGS = (
+    'extends', 'load', 'block', 'endblock', 'if', 'elif', 'else', 'endif',
+    'for', 'empty', 'endfor', 'with', 'endwith', 'comment', 'endcomment',
+    'thumbnail', 'endthumbnail', 'swrcache', 'endswrcache',
+)
+PRESERVED = re.compile(r'<(pre|textarea)\b.*?</\1\s*>', re.S | re.I)
+LINE_BREAK = re.compile(r'[ \t\r\f\v]*\n\s*')
+TAG_LINE = re.compile(
+    r'^(\{%\s*(?:' + '|'.join(JOINED_TAGS) + r')\b(?:(?!%\}).)*%\}'
+    r'|\{#(?:(?!#\}).)*#\})\n',
+    re.M
+)
+MAIL_TEMPLATE = re.compile(r'(^|/)registration/|mail')
+
+
+def _collapse(text):
+    return TAG_LINE.sub(r'\1', LINE_BREAK.sub('\n', text))
+
+
+def minify(source):
+    source = source.rstrip(' \t')
+    chunks = []
+    position = 0
+    for match in PRESERVED.finditer(source):
+        chunks.append(_collapse(source[position:match.start()]))
+        chunks.append(match.group())
+        position = match.end()
+    chunks.append(_collapse(source[position:]))
+    return ''.join(chunks)
+
+
+def is_minified(origin):
+    return (
+        origin.name.endswith('.html')
+        and origin.name.startswith(
+            os.path.join(settings.TEMPLATES_DIR, '')
+        )
+        and not MAIL_TEMPLATE.search(origin.template_name)
+    )
+
+
+class FilesystemLoader(filesystem.Loader):
+    def get_contents(self, origin):
+        contents = super().get_contents(origin)
+        if is_minified(origin):
+            return minify(contents)
+        return contents
@@ -0,0 +1,37 @@
+from django.core.exceptions import SuspiciousOperation
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import F, Sum
+
+from core.models import MediaFile
+
+
+def megabytes(size):
+    return f'{(size or 0) / 1024 / 1024:.1f} МБ'
+
+
+class Command(BaseCommand):
+    help = 'Показывает, сколько места экономит хранение одинаковых файлов.'
+
+    def handle(self, *args, **options):
+        for media_file in MediaFile.objects.filter(size=None):
+            try:
+                size = default_storage.size(media_file.name)
+            except (OSError, SuspiciousOperation):
+                continue
+            MediaFile.objects.filter(pk=media_file.pk).update(size=size)
+        totals = MediaFile.objects.filter(refs__gt=0).aggregate(
+            stored=Sum('size'),
+            referenced=Sum(F('size') * F('refs')),
+            references=Sum('refs'),
+        )
+        files = MediaFile.objects.filter(refs__gt=0).count()
+        unused = MediaFile.objects.filter(refs=0).count()
+        saved = (totals['referenced'] or 0) - (totals['stored'] or 0)
+        self.stdout.write(
+            f'Файлов: {files}, ссылок на них: {totals["references"] or 0}\n'
+            f'Хранится: {megabytes(totals["stored"])}, '
+            f'без дедупликации было бы: {megabytes(totals["referenced"])}\n'
+            f'Экономия: {megabytes(saved)}\n'
+            f'Ожидают удаления: {unused}'
+        )
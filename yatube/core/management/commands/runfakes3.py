@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.fakes3 import FakeS3, make_fake_server
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает локальный S3-совместимый сервер для разработки '
+        'с настройками из S3_STORAGE.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--port', type=int, default=9000,
+            help='Порт сервера.'
+        )
+        parser.add_argument(
+            '--root', default=settings.MEDIA_ROOT,
+            help='Каталог для хранения объектов.'
+        )
+
+    def handle(self, *args, **options):
+        server = make_fake_server(
+            FakeS3(
+                settings.S3_STORAGE['ACCESS_KEY'],
+                settings.S3_STORAGE['SECRET_KEY'],
+                settings.S3_STORAGE.get('REGION', 'us-east-1'),
+                root=options['root'],
+            ),
+            port=options['port'],
+        )
+        self.stdout.write(
+            f'Fake S3 слушает http://127.0.0.1:{server.server_port}/'
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,63 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core.tasks import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди в базе данных.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=settings.TASKS_WORKERS,
+            help='Число потоков, выполняющих задачи.'
+        )
+        parser.add_argument(
+            '--poll', type=float, default=settings.TASKS_POLL_INTERVAL,
+            help='Интервал опроса очереди в секундах.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        backend = get_backend('database')
+        threads = options['threads']
+        requeued = backend.requeue_stale(settings.TASKS_VISIBILITY_TIMEOUT)
+        if requeued:
+            self.stdout.write(f'Возвращено в очередь задач: {requeued}')
+        done = failed = 0
+        running = set()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            while True:
+                free = threads - len(running)
+                claimed = backend.claim(free) if free else []
+                for pk in claimed:
+                    running.add(pool.submit(self._execute, backend, pk))
+                if not running:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll'])
+                    continue
+                finished, running = wait(
+                    running, timeout=options['poll'],
+                    return_when=FIRST_COMPLETED
+                )
+                for future in finished:
+                    if future.result():
+                        done += 1
+                    else:
+                        failed += 1
+        self.stdout.write(f'Выполнено задач: {done}, с ошибкой: {failed}')
+
+    @staticmethod
+    def _execute(backend, pk):
+        try:
+            return backend.execute(pk)
+        finally:
+            close_old_connections()
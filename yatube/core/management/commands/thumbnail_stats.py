@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from sorl.thumbnail import default
+
+
+def share(part, total):
+    return f'{part} ({part / total:.0%})' if total else '0'
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает, откуда берутся записи о миниатюрах: из кэша, '
+        'из базы или их нет совсем.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Обнулить счётчики после вывода.'
+        )
+
+    def handle(self, *args, **options):
+        if not hasattr(default.kvstore, 'stats'):
+            raise CommandError(
+                'THUMBNAIL_KVSTORE не ведёт счётчиков, '
+                'укажите core.thumbnails.KVStore.'
+            )
+        stats = default.kvstore.stats()
+        total = sum(stats.values())
+        self.stdout.write(
+            f'Запросов записей о миниатюрах: {total}\n'
+            f'Из кэша: {share(stats["cache"], total)}\n'
+            f'Из базы: {share(stats["database"], total)}\n'
+            f'Не найдено: {share(stats["miss"], total)}'
+        )
+        if options['reset']:
+            default.kvstore.reset_stats()
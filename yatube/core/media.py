@@ -0,0 +1,48 @@
+"""
+Reference counts of stored media files.
+
+Rows that point to a file acquire it on save and release it when they
+stop pointing to it or are deleted. A file whose count drops to zero is
+removed with its thumbnails by a background task after
+MEDIA_DELETE_DELAY seconds; the task checks the count again, so a file
+uploaded again in the meantime is kept.
+"""
+from django.conf import settings
+from django.db.models import F
+from sorl.thumbnail import delete as delete_thumbnails
+
+from .models import MediaFile
+from .tasks import task
+
+
+def acquire(*names):
+    for name in filter(None, names):
+        rows = MediaFile.objects.filter(name=name).update(refs=F('refs') + 1)
+        if not rows:
+            # The size is filled in by manage.py media_report.
+            _, created = MediaFile.objects.get_or_create(
+                name=name, defaults={'refs': 1}
+            )
+            if not created:
+                MediaFile.objects.filter(name=name).update(
+                    refs=F('refs') + 1
+                )
+
+
+def release(*names):
+    for name in filter(None, names):
+        MediaFile.objects.filter(name=name, refs__gt=0).update(
+            refs=F('refs') - 1
+        )
+        if MediaFile.objects.filter(name=name, refs=0).exists():
+            delete_unused.enqueue(
+                (name,), countdown=settings.MEDIA_DELETE_DELAY
+            )
+
+
+@task(max_retries=3)
+def delete_unused(name):
+    """Remove the file and its thumbnails if nothing references it."""
+    deleted, _ = MediaFile.objects.filter(name=name, refs=0).delete()
+    if deleted:
+        delete_thumbnails(name)
@@ -0,0 +1,44 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:44
+
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def count_references(apps, schema_editor):
+    MediaFile = apps.get_model('core', 'MediaFile')
+    refs = Counter()
+    for model in ('Post', 'ArchivedPost'):
+        refs.update(
+            apps.get_model('posts', model).objects.exclude(image='')
+            .values_list('image', flat=True)
+        )
+    MediaFile.objects.bulk_create(
+        MediaFile(name=name, refs=number) for name, number in refs.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('posts', '0022_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaFile',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('size', models.PositiveIntegerField(blank=True, null=True)),
+                ('refs', models.PositiveIntegerField(default=0)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Медиафайл',
+                'verbose_name_plural': 'Медиафайлы',
+            },
+        ),
+        migrations.RunPython(count_references, migrations.RunPython.noop),
+    ]
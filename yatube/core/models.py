@@ -1,12 +1,139 @@
 from django.db import models
+from django.utils import timezone
+
+from .signals import soft_deleted
 
 
 class CreatedModel(models.Model):
     """Abstract model to add publication date."""
     pub_date = models.DateTimeField(
         verbose_name='Дата публикации',
-        auto_now_add=True
+        auto_now_add=True,
+        db_index=True
     )
 
     class Meta:
         abstract = True
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    """
+    ``delete()`` marks rows as deleted with one UPDATE; the rows and their
+    dependents are removed later in the background with ``hard_delete()``.
+    """
+    def delete(self):
+        return self.mark_deleted(timezone.now())
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def mark_deleted(self, deleted_at):
+        pks = list(self.filter(deleted_at=None).values_list('pk', flat=True))
+        rows = self.model._base_manager.filter(
+            pk__in=pks, deleted_at=None
+        ).update(deleted_at=deleted_at) if pks else 0
+        if rows:
+            soft_deleted.send(sender=self.model, pks=pks)
+        return rows, {self.model._meta.label: rows}
+
+    mark_deleted.alters_data = True
+
+    def hard_delete(self):
+        return super().delete()
+
+    hard_delete.alters_data = True
+    hard_delete.queryset_only = True
+
+
+class SoftDeleteManager(models.Manager):
+    """Manager that hides the rows marked as deleted."""
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at=None)
+
+
+class SoftDeleteModel(models.Model):
+    """
+    Abstract model deleted in two steps: ``delete()`` hides the row from
+    ``objects`` at once, the background purge removes it with
+    ``hard_delete()``. ``all_objects`` sees the hidden rows as well.
+    """
+    deleted_at = models.DateTimeField(
+        verbose_name='Дата удаления',
+        blank=True,
+        null=True,
+        editable=False,
+        db_index=True
+    )
+
+    objects = SoftDeleteManager.from_queryset(SoftDeleteQuerySet)()
+    all_objects = models.Manager.from_queryset(SoftDeleteQuerySet)()
+
+    class Meta:
+        abstract = True
+
+    def delete(self, using=None, keep_parents=False):
+        self.deleted_at = timezone.now()
+        return type(self).all_objects.using(using).filter(
+            pk=self.pk
+        ).mark_deleted(self.deleted_at)
+
+    def hard_delete(self, using=None, keep_parents=False):
+        return super().delete(using, keep_parents)
+
+
+class Job(models.Model):
+    """Background task stored by the database queue backend."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+    name = models.CharField(max_length=200)
+    payload = models.TextField(default='{}')
+    priority = models.SmallIntegerField(default=0)
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=QUEUED
+    )
+    run_at = models.DateTimeField()
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_retries = models.PositiveSmallIntegerField(default=0)
+    started_at = models.DateTimeField(blank=True, null=True)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        indexes = [
+            models.Index(
+                fields=['status', '-priority', 'run_at'],
+                name='core_job_queue_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} [{self.status}]'
+
+
+class MediaFile(models.Model):
+    """
+    Stored media file shared by every row that references it. Uploads are
+    named by content hash, so equal images are stored once; the file is
+    removed when the last reference is released (see ``core.media``).
+    """
+    name = models.CharField(max_length=255, unique=True)
+    size = models.PositiveIntegerField(blank=True, null=True)
+    refs = models.PositiveIntegerField(default=0)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Медиафайл'
+        verbose_name_plural = 'Медиафайлы'
+
+    def __str__(self):
+        return f'{self.name} ({self.refs})'
@@ -0,0 +1,123 @@
+"""
+Full-page cache with holes.
+
+A cached view is rendered once per path and query string for an anonymous
+visitor. The parts that depend on the user are marked in the templates
+with ``{% hole %}``: while the page is rendered for the cache they come
+out as placeholders, so the cached shell is the same for everybody.
+Visitors without a session cookie get the shell with the holes filled for
+an anonymous user, rendered once along with it. Everybody else gets the
+shell with only the holes rendered for their request.
+
+Pages are keyed by the path and the KEY_PARAMS of the query string, the
+only parameters the cached views read: other parameters, such as the
+``utm_*`` tags of links, share the entry of the page.
+
+All pages are dropped at once by ``invalidate()`` when the content shown
+on them changes; entries are kept for PAGE_CACHE_TIMEOUT seconds and
+recomputed by a single request, see ``core.swr``.
+"""
+import hashlib
+import json
+import re
+import uuid
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from copy import copy
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+
+from .swr import Uncacheable, get_or_compute, is_cacheable
+
+GENERATION_KEY = 'page:generation'
+KEY_PARAMS = ('page',)
+HOLE_PATTERN = re.compile(r'<!--hole:([\w=-]+)-->')
+
+_hole_contexts = {}
+
+
+def hole_context(template_name):
+    """
+    Register the function that builds the context of a hole template for
+    a request when the hole is filled in a cached shell.
+    """
+    def decorator(func):
+        _hole_contexts[template_name] = func
+        return func
+    return decorator
+
+
+def hole_marker(template_name, kwargs):
+    data = json.dumps([template_name, kwargs]).encode()
+    return f'<!--hole:{urlsafe_b64encode(data).decode()}-->'
+
+
+def render_hole(request, template_name, kwargs):
+    context = dict(kwargs)
+    if template_name in _hole_contexts:
+        context.update(_hole_contexts[template_name](request, **kwargs))
+    return render_to_string(template_name, context, request)
+
+
+def fill_holes(shell, request):
+    def fill(match):
+        template_name, kwargs = json.loads(urlsafe_b64decode(match.group(1)))
+        return render_hole(request, template_name, kwargs)
+    return HOLE_PATTERN.sub(fill, shell)
+
+
+def is_shell(request):
+    return getattr(request, 'page_shell', False)
+
+
+def invalidate():
+    cache.set(GENERATION_KEY, uuid.uuid4().hex, None)
+
+
+def _page_key(request):
+    generation = cache.get_or_set(GENERATION_KEY, uuid.uuid4().hex, None)
+    params = urlencode([
+        (name, request.GET[name]) for name in KEY_PARAMS
+        if name in request.GET
+    ])
+    path = hashlib.md5(f'{request.path}?{params}'.encode()).hexdigest()
+    return f'page:{generation}:{path}'
+
+
+def cached_page(view):
+    """Serve the GET requests of the view from the page cache."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method != 'GET' or not settings.PAGE_CACHE_TIMEOUT:
+            return view(request, *args, **kwargs)
+
+        def render():
+            shell_request = copy(request)
+            shell_request.META = request.META.copy()
+            shell_request.user = AnonymousUser()
+            shell_request.page_shell = True
+            response = view(shell_request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response.render()
+            if not is_cacheable(shell_request, response):
+                raise Uncacheable(response)
+            shell = response.content.decode(response.charset)
+            shell_request.page_shell = False
+            page = fill_holes(shell, shell_request)
+            return shell, page, response['Content-Type']
+
+        try:
+            shell, page, content_type = get_or_compute(
+                _page_key(request), render, settings.PAGE_CACHE_TIMEOUT
+            )
+        except Uncacheable:
+            return view(request, *args, **kwargs)
+        if settings.SESSION_COOKIE_NAME in request.COOKIES:
+            page = fill_holes(shell, request)
+        return HttpResponse(page, content_type=content_type)
+    return wrapper
@@ -0,0 +1,195 @@
+import hashlib
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import (EmptyPage, InvalidPage, PageNotAnInteger,
+                                   Paginator)
+from django.db import DatabaseError, connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+def estimated_count(model, using='default'):
+    """
+    Row count of the model table from planner statistics, or None.
+
+    SQLite keeps it in ``sqlite_stat1`` after ``ANALYZE``, PostgreSQL in
+    ``pg_class.reltuples`` after ``ANALYZE`` or autovacuum.
+    """
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'sqlite':
+        sql = 'SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1'
+    elif connection.vendor == 'postgresql':
+        sql = 'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass'
+    else:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate >= 0 else None
+
+
+def _where_sql(queryset):
+    query = queryset.query
+    if not query.where:
+        return None
+    try:
+        return query.get_compiler(queryset.db).compile(query.where)
+    except EmptyResultSet:
+        return False
+
+
+def is_unfiltered(queryset):
+    """
+    True for all rows of the default manager. Its own filter, such as the
+    one hiding deleted rows, does not count: the estimate is close enough.
+    """
+    query = queryset.query
+    if query.distinct or query.combinator:
+        return False
+    return _where_sql(queryset) == _where_sql(
+        queryset.model._default_manager.all()
+    )
+
+
+def approximate_count(queryset, cached=True):
+    """
+    Number of rows of the queryset and whether it is an estimate.
+
+    Up to ESTIMATED_COUNT_THRESHOLD rows are counted exactly; counting
+    stops there, so the scan stays short. Larger sets take the table
+    statistics when unfiltered, otherwise an exact count cached for
+    ESTIMATED_COUNT_TIMEOUT seconds, or counted anew unless ``cached``.
+    """
+    threshold = settings.ESTIMATED_COUNT_THRESHOLD
+    if is_unfiltered(queryset):
+        estimate = estimated_count(queryset.model, queryset.db)
+        if estimate is not None and estimate >= threshold:
+            return estimate, True
+    count = queryset.order_by()[:threshold + 1].count()
+    if count <= threshold:
+        return count, False
+    if not cached:
+        return queryset.count(), False
+    key = 'count:' + hashlib.md5(str(queryset.query).encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.ESTIMATED_COUNT_TIMEOUT)
+    return count, True
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that counts large querysets approximately, see
+    ``approximate_count()``. Object lists other than querysets may provide
+    their own ``approximate_count()``; ``count_is_estimate`` tells the
+    template to say "about N".
+    """
+    count_is_estimate = False
+    cache_counts = True
+
+    @cached_property
+    def count(self):
+        object_list = self.object_list
+        if isinstance(object_list, QuerySet):
+            counter = partial(
+                approximate_count, object_list, cached=self.cache_counts
+            )
+        else:
+            counter = getattr(object_list, 'approximate_count', None)
+        if counter is None:
+            return super().count
+        count, self.count_is_estimate = counter()
+        return count
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_is_estimate:
+            return super().page(number)
+        # The last page is not cut at an estimated total.
+        bottom = (number - 1) * self.per_page
+        return self._get_page(
+            self.object_list[bottom:bottom + self.per_page], number, self
+        )
+
+
+class AdminPaginator(EstimatedCountPaginator):
+    """
+    Paginator of the admin changelists: filtered lists are counted exactly
+    every time, as staff acts on the numbers; only whole tables take the
+    statistics, and the pagination template says "about N" for them.
+    """
+    cache_counts = False
+
+
+class UncountedPaginator(Paginator):
+    """
+    Paginator for feeds too large to count. A page reads one extra row to
+    learn whether the next page exists, so ``num_pages`` ends at the next
+    page and ``count`` stays None until the last page is reached.
+    """
+    count = None
+    num_pages = None
+    page_range = None
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and number > 1:
+            raise EmptyPage('That page contains no results')
+        if len(rows) > self.per_page:
+            self.num_pages = number + 1
+        else:
+            self.num_pages = number
+            self.count = bottom + len(rows)
+        return self._get_page(rows[:self.per_page], number, self)
+
+    def get_page(self, number):
+        try:
+            return self.page(number)
+        except InvalidPage:
+            return self.page(1)
+
+
+def page_window(page, on_each_side=2, on_ends=1):
+    """
+    Page numbers to link from ``page``: the first and last ``on_ends``
+    pages and ``on_each_side`` pages around the current one, with None in
+    the gaps.
+    """
+    number = page.number
+    num_pages = page.paginator.num_pages
+    pages = []
+    if number > on_each_side + on_ends + 2:
+        pages += range(1, on_ends + 1)
+        pages.append(None)
+        pages += range(number - on_each_side, number + 1)
+    else:
+        pages += range(1, number + 1)
+    if number < num_pages - on_each_side - on_ends - 1:
+        pages += range(number + 1, number + on_each_side + 1)
+        pages.append(None)
+        pages += range(num_pages - on_ends + 1, num_pages + 1)
+    else:
+        pages += range(number + 1, num_pages + 1)
+    return pages
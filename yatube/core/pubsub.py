@@ -0,0 +1,175 @@
+"""
+Publish/subscribe channels for live page updates.
+
+Every message gets an increasing id within its channel, so subscribers only
+remember the last id they have seen. ``settings.PUBSUB_BACKEND`` selects
+``local`` (one process, for development) or ``cache`` (the shared cache,
+for several workers and the ASGI application).
+"""
+import abc
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+
+
+class BaseBackend(abc.ABC):
+    poll_interval = 0.5
+
+    @abc.abstractmethod
+    def publish(self, channel, data):
+        """Store the message and return its id."""
+
+    @abc.abstractmethod
+    def last_id(self, channel):
+        """Return the id of the newest message, 0 for an empty channel."""
+
+    @abc.abstractmethod
+    def fetch(self, channel, last_id):
+        """Return ``(id, data)`` pairs published after ``last_id``."""
+
+    def wait(self, channel, last_id, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            messages = self.fetch(channel, last_id)
+            remaining = deadline - time.monotonic()
+            if messages or remaining <= 0:
+                return messages
+            time.sleep(min(self.poll_interval, remaining))
+
+    async def async_wait(self, channel, last_id, timeout):
+        """
+        Wait without holding a thread: the idle time is spent in the event
+        loop and only the short fetches run in the executor.
+        """
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout
+        while True:
+            messages = await loop.run_in_executor(
+                None, self.fetch, channel, last_id
+            )
+            remaining = deadline - loop.time()
+            if messages or remaining <= 0:
+                return messages
+            await asyncio.sleep(min(self.poll_interval, remaining))
+
+
+class LocalBackend(BaseBackend):
+    def __init__(self):
+        self._channels = {}
+        self._ids = itertools.count(1)
+        self._condition = threading.Condition()
+
+    def publish(self, channel, data):
+        with self._condition:
+            message_id = next(self._ids)
+            self._channels.setdefault(
+                channel, deque(maxlen=settings.PUBSUB_BACKLOG)
+            ).append((message_id, data))
+            self._condition.notify_all()
+        return message_id
+
+    def last_id(self, channel):
+        with self._condition:
+            messages = self._channels.get(channel)
+            return messages[-1][0] if messages else 0
+
+    def fetch(self, channel, last_id):
+        with self._condition:
+            return [
+                message for message in self._channels.get(channel, ())
+                if message[0] > last_id
+            ]
+
+    def wait(self, channel, last_id, timeout):
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self.fetch(channel, last_id), timeout
+            )
+            return self.fetch(channel, last_id)
+
+
+class CacheBackend(BaseBackend):
+    """
+    Channels in the shared cache: an atomic counter per channel and one
+    key per message that expires after ``PUBSUB_RETENTION`` seconds.
+    """
+    def _counter_key(self, channel):
+        return f'pubsub:{channel}:last'
+
+    def _message_key(self, channel, message_id):
+        return f'pubsub:{channel}:{message_id}'
+
+    def publish(self, channel, data):
+        counter_key = self._counter_key(channel)
+        cache.add(counter_key, 0, None)
+        message_id = cache.incr(counter_key)
+        cache.set(
+            self._message_key(channel, message_id), data,
+            settings.PUBSUB_RETENTION
+        )
+        return message_id
+
+    def last_id(self, channel):
+        return cache.get(self._counter_key(channel), 0)
+
+    def fetch(self, channel, last_id):
+        current = self.last_id(channel)
+        if current < last_id:
+            # The counter was evicted and started over.
+            last_id = 0
+        if current == last_id:
+            return []
+        first = max(last_id + 1, current - settings.PUBSUB_BACKLOG + 1)
+        keys = [
+            self._message_key(channel, message_id)
+            for message_id in range(first, current + 1)
+        ]
+        found = cache.get_many(keys)
+        return [
+            (message_id, found[key])
+            for message_id, key in zip(range(first, current + 1), keys)
+            if key in found
+        ]
+
+
+BACKENDS = {
+    'local': LocalBackend,
+    'cache': CacheBackend,
+}
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_pubsub():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = BACKENDS[settings.PUBSUB_BACKEND]()
+        return _backend
+
+
+def publish(channel, data):
+    return get_pubsub().publish(channel, data)
+
+
+def check_shared():
+    """
+    Raise ImproperlyConfigured unless messages reach other processes: the
+    ASGI application streams what the WSGI workers publish.
+    """
+    backend = get_pubsub()
+    if isinstance(backend, LocalBackend) or (
+        isinstance(backend, CacheBackend)
+        and isinstance(caches['default'], LocMemCache)
+    ):
+        raise ImproperlyConfigured(
+            "The ASGI application needs PUBSUB_BACKEND = 'cache' with a "
+            "cache shared between processes, such as Memcached."
+        )
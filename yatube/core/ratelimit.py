@@ -0,0 +1,89 @@
+"""
+Request rate limits for the write endpoints.
+
+Requests are counted per user and per client IP with a sliding window
+approximated from two fixed windows: the count of the current window plus
+the previous one weighted by the part of it still inside the window.
+Counters live in the shared cache and are changed with an atomic
+``incr``, so a check costs two cache round trips: the ``incr`` of the
+current window and the ``get`` of the previous one. Only the first
+request of a window, whose counter is not there yet, also calls ``add``.
+
+Rejected requests are counted too: a client that keeps sending requests
+over the limit stays limited until it slows down, instead of getting
+through again as soon as the window moves.
+
+``settings.RATELIMITS`` maps a scope to ``(user rate, IP rate)``, where a
+rate is ``'<requests>/<s|m|h|d>'`` and ``None`` disables the limit.
+"""
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .views import too_many_requests
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+def parse_rate(rate):
+    number, period = rate.split('/')
+    return int(number), PERIODS[period]
+
+
+def client_ip(request):
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def hit(key, rate, now=None):
+    """
+    Count a request and return the number of seconds to wait when the rate
+    is exceeded, or 0.
+    """
+    limit, window = parse_rate(rate)
+    now = time.time() if now is None else now
+    current = int(now // window)
+    current_key = f'rl:{key}:{window}:{current}'
+    previous_key = f'rl:{key}:{window}:{current - 1}'
+    try:
+        count = cache.incr(current_key)
+    except ValueError:
+        # The first request of the window. The counter is kept for the
+        # next window too, where it is "previous".
+        if cache.add(current_key, 1, window * 2):
+            count = 1
+        else:
+            count = cache.incr(current_key)
+    previous = cache.get(previous_key, 0)
+    elapsed = now / window - current
+    if previous * (1 - elapsed) + count <= limit:
+        return 0
+    return max(int(window * (1 - elapsed)), 1)
+
+
+def check(request, scope):
+    """Return the seconds to wait for the user or the IP, or 0."""
+    user_rate, ip_rate = settings.RATELIMITS[scope]
+    retry_after = 0
+    if user_rate and request.user.is_authenticated:
+        retry_after = hit(f'{scope}:user:{request.user.pk}', user_rate)
+    if ip_rate:
+        retry_after = max(
+            retry_after, hit(f'{scope}:ip:{client_ip(request)}', ip_rate)
+        )
+    return retry_after
+
+
+def ratelimit(scope, methods=('POST',)):
+    """Answer 429 to requests of ``methods`` that exceed the scope rates."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if settings.RATELIMIT_ENABLE and request.method in methods:
+                retry_after = check(request, scope)
+                if retry_after:
+                    return too_many_requests(request, retry_after)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
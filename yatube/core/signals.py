@@ -0,0 +1,9 @@
+from django.dispatch import Signal
+
+# Sent by SoftDeleteQuerySet.delete() after rows were marked as deleted,
+# with the primary keys of the rows of the batch.
+soft_deleted = Signal(providing_args=['pks'])
+
+# Sent by posts.archive after the posts were copied to the archive and
+# before their hot rows are deleted, with the primary keys of the chunk.
+archived = Signal(providing_args=['pks'])
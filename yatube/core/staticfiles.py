@@ -0,0 +1,164 @@
+"""
+Static files served by the application.
+
+``collectstatic`` with ``CompressedManifestStaticFilesStorage`` copies the
+files to STATIC_ROOT under names with a hash of their content, so a name
+never changes its content, and writes gzip copies of the text files next
+to them. ``brotli`` is not among the requirements: brotli copies are
+written only where the package is installed separately.
+``StaticFilesMiddleware`` answers STATIC_URL requests from STATIC_ROOT
+before the rest of the stack: the hashed names with a far-future
+Cache-Control, and the smallest copy the browser accepts, each copy with
+an ETag of its own, so no web server is needed in front of the workers.
+"""
+import gzip
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (ManifestStaticFilesStorage,
+                                                staticfiles_storage)
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.ico', '.txt', '.json', '.xml', '.html',
+)
+# Copies that save less than this share of the size are not kept.
+MIN_SAVING = 0.05
+
+
+def _gzip(content):
+    return gzip.compress(content, compresslevel=9, mtime=0)
+
+
+def _brotli(content):
+    return brotli.compress(content, quality=11)
+
+
+# Content-Encoding and file suffix of the copies, the preferred first.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+ENCODED_SUFFIXES = tuple(suffix for _, suffix in ENCODINGS)
+COMPRESSORS = {'.gz': _gzip}
+if brotli is not None:
+    COMPRESSORS['.br'] = _brotli
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Not collected yet, as in development: the finders serve it.
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if name.endswith(COMPRESS_EXTENSIONS):
+                self._compress(name)
+
+    def _compress(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as file:
+            content = file.read()
+        for suffix, compress in COMPRESSORS.items():
+            compressed = compress(content)
+            if len(compressed) < len(content) * (1 - MIN_SAVING):
+                with open(path + suffix, 'wb') as file:
+                    file.write(compressed)
+
+
+def accepted_encodings(request):
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00'):
+            accepted.add(coding.strip())
+    return accepted
+
+
+class StaticFile:
+    def __init__(self, path, immutable):
+        self.path = path
+        self.content_type = (
+            mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        )
+        self.variants = [
+            (encoding, path + suffix) for encoding, suffix in ENCODINGS
+            if os.path.exists(path + suffix)
+        ]
+        stat = os.stat(path)
+        self.etag = f'{stat.st_size:x}-{int(stat.st_mtime):x}'
+        self.cache_control = (
+            settings.STATIC_CACHE_CONTROL if immutable else 'no-cache'
+        )
+
+    def _headers(self, response, etag):
+        response['Cache-Control'] = self.cache_control
+        response['ETag'] = etag
+        if self.variants:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    def response(self, request):
+        path, encoding = self.path, None
+        accepted = accepted_encodings(request)
+        for variant_encoding, variant_path in self.variants:
+            if variant_encoding in accepted:
+                path, encoding = variant_path, variant_encoding
+                break
+        # The copies have other bytes than the file: each has its own tag.
+        etag = f'"{self.etag}-{encoding}"' if encoding else f'"{self.etag}"'
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match and etag in parse_etags(if_none_match):
+            return self._headers(HttpResponseNotModified(), etag)
+        response = FileResponse(
+            open(path, 'rb'), content_type=self.content_type
+        )
+        # FileResponse names the file; the name of a copy is meaningless.
+        del response['Content-Disposition']
+        if encoding:
+            response['Content-Encoding'] = encoding
+        return self._headers(response, etag)
+
+
+class StaticFilesMiddleware:
+    """
+    Serve the collected static files. The files are listed once when the
+    worker starts, so run ``collectstatic`` before starting the workers.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.files = self._index() if settings.STATIC_ROOT else {}
+
+    def _index(self):
+        hashed = set(getattr(staticfiles_storage, 'hashed_files', {}).values())
+        files = {}
+        for directory, _, names in os.walk(settings.STATIC_ROOT):
+            for name in names:
+                if name.endswith(ENCODED_SUFFIXES):
+                    continue
+                path = os.path.join(directory, name)
+                relative = os.path.relpath(path, settings.STATIC_ROOT)
+                relative = relative.replace(os.sep, '/')
+                files[settings.STATIC_URL + relative] = StaticFile(
+                    path, relative in hashed
+                )
+        return files
+
+    def __call__(self, request):
+        static_file = self.files.get(request.path_info)
+        if static_file is None or request.method not in ('GET', 'HEAD'):
+            return self.get_response(request)
+        return static_file.response(request)
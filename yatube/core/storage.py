@@ -0,0 +1,187 @@
+"""
+Media storage.
+
+``S3Storage`` keeps files in an S3-compatible object store (AWS S3,
+MinIO, or ``core.fakes3`` in development and tests) and builds file URLs
+from MEDIA_URL, which points to the CDN in front of the bucket, so
+application workers never stream media. Both storages name uploads after
+the SHA-256 of their content: a name never changes its content and may be
+cached by browsers and the CDN forever.
+"""
+import datetime
+import hashlib
+import hmac
+import mimetypes
+import posixpath
+from urllib.parse import quote, urljoin
+
+import requests
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, Storage
+from django.utils.deconstruct import deconstructible
+from django.utils.encoding import filepath_to_uri
+
+EMPTY_SHA256 = hashlib.sha256(b'').hexdigest()
+CHUNK_SIZE = 64 * 1024
+
+
+def content_hash(file):
+    """SHA-256 of a file read in chunks, leaving the file at the start."""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+class HashedNameMixin:
+    """
+    Store files saved under MEDIA_HASHED_PREFIXES as
+    ``<directory>/<sha256><extension>``. Content that is already stored
+    is not written again. Other files, such as thumbnails, keep the
+    names they are saved with.
+    """
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if name.startswith(tuple(settings.MEDIA_HASHED_PREFIXES)):
+            directory, filename = posixpath.split(name)
+            extension = posixpath.splitext(filename)[1].lower()
+            name = posixpath.join(
+                directory, content_hash(content) + extension
+            )
+            if self.exists(name):
+                return name
+        return super().save(name, content, max_length)
+
+
+@deconstructible
+class HashedFileSystemStorage(HashedNameMixin, FileSystemStorage):
+    pass
+
+
+def _sign(key, message):
+    return hmac.new(key, message.encode(), hashlib.sha256).digest()
+
+
+def sign_request(method, url_path, query, headers, payload_hash,
+                 access_key, secret_key, region, now=None):
+    """
+    Add AWS Signature Version 4 headers to ``headers`` for the S3 service.
+    ``url_path`` must already be URI-encoded and ``headers`` must contain
+    ``host``.
+    """
+    now = now or datetime.datetime.utcnow()
+    amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+    date = now.strftime('%Y%m%d')
+    headers['x-amz-date'] = amz_date
+    headers['x-amz-content-sha256'] = payload_hash
+    signed = sorted(name.lower() for name in headers)
+    lower = {name.lower(): str(value).strip()
+             for name, value in headers.items()}
+    canonical_query = '&'.join(
+        f'{quote(k, safe="-_.~")}={quote(v, safe="-_.~")}'
+        for k, v in sorted(query.items())
+    )
+    canonical_request = '\n'.join((
+        method,
+        url_path,
+        canonical_query,
+        ''.join(f'{name}:{lower[name]}\n' for name in signed),
+        ';'.join(signed),
+        payload_hash,
+    ))
+    scope = f'{date}/{region}/s3/aws4_request'
+    string_to_sign = '\n'.join((
+        'AWS4-HMAC-SHA256',
+        amz_date,
+        scope,
+        hashlib.sha256(canonical_request.encode()).hexdigest(),
+    ))
+    key = _sign(f'AWS4{secret_key}'.encode(), date)
+    for part in (region, 's3', 'aws4_request'):
+        key = _sign(key, part)
+    signature = hmac.new(
+        key, string_to_sign.encode(), hashlib.sha256
+    ).hexdigest()
+    headers['Authorization'] = (
+        f'AWS4-HMAC-SHA256 Credential={access_key}/{scope},'
+        f'SignedHeaders={";".join(signed)},Signature={signature}'
+    )
+    return headers
+
+
+@deconstructible
+class S3Storage(HashedNameMixin, Storage):
+    """Storage in an S3 bucket with path-style addressing."""
+    def __init__(self, options=None):
+        options = options or settings.S3_STORAGE
+        self.endpoint_url = options['ENDPOINT_URL'].rstrip('/')
+        self.bucket = options['BUCKET']
+        self.access_key = options['ACCESS_KEY']
+        self.secret_key = options['SECRET_KEY']
+        self.region = options.get('REGION', 'us-east-1')
+        self.timeout = options.get('TIMEOUT', 10)
+        self.session = requests.Session()
+
+    def _request(self, method, name, data=b'', headers=None):
+        path = '/' + quote(f'{self.bucket}/{name}', safe='/-_.~')
+        headers = dict(headers or {})
+        headers['host'] = self.endpoint_url.split('://', 1)[1]
+        payload_hash = hashlib.sha256(data).hexdigest()
+        sign_request(
+            method, path, {}, headers, payload_hash,
+            self.access_key, self.secret_key, self.region
+        )
+        return self.session.request(
+            method, self.endpoint_url + path, data=data, headers=headers,
+            timeout=self.timeout
+        )
+
+    def _open(self, name, mode='rb'):
+        response = self._request('GET', name)
+        if response.status_code == 404:
+            raise FileNotFoundError(name)
+        response.raise_for_status()
+        return ContentFile(response.content, name=name)
+
+    def _save(self, name, content):
+        content.seek(0)
+        data = content.read()
+        content_type = (
+            getattr(content, 'content_type', None)
+            or mimetypes.guess_type(name)[0]
+            or 'application/octet-stream'
+        )
+        response = self._request('PUT', name, data, {
+            'Content-Type': content_type,
+            'Cache-Control': settings.MEDIA_CACHE_CONTROL,
+        })
+        response.raise_for_status()
+        return name
+
+    def delete(self, name):
+        response = self._request('DELETE', name)
+        if response.status_code not in (200, 204, 404):
+            response.raise_for_status()
+
+    def _head(self, name):
+        response = self._request('HEAD', name)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response
+
+    def exists(self, name):
+        return self._head(name) is not None
+
+    def size(self, name):
+        response = self._head(name)
+        if response is None:
+            raise FileNotFoundError(name)
+        return int(response.headers['Content-Length'])
+
+    def url(self, name):
+        return urljoin(settings.MEDIA_URL, filepath_to_uri(name))
@@ -0,0 +1,89 @@
+"""
+Stale-while-revalidate caching with request coalescing.
+
+An entry outlives its timeout by SWR_STALE_TIMEOUT seconds. The first
+caller that finds it stale takes a short lock with ``cache.add`` and
+recomputes the value; every other caller, on any worker, is served the
+stale value meanwhile. Callers that find no entry at all wait for the lock
+holder instead of computing the same value in parallel.
+
+Entries are also refreshed a little before they expire, with a chance
+that grows near the expiry and with the time the value took to compute
+(probabilistic early expiration), so the busy keys are usually refreshed
+before anybody sees them stale.
+"""
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+WAIT_INTERVAL = 0.05
+
+
+class Uncacheable(Exception):
+    """Raised by a computation whose result must not be stored."""
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+
+def _is_fresh(expires, delta):
+    # -log(u) is exponentially distributed: mostly small, rarely large.
+    early = -delta * settings.SWR_BETA * math.log(1 - random.random())
+    return time.time() + early < expires
+
+
+def _store(key, compute, timeout):
+    started = time.time()
+    value = compute()
+    now = time.time()
+    cache.set(
+        key, (value, now + timeout, now - started),
+        timeout + settings.SWR_STALE_TIMEOUT
+    )
+    return value
+
+
+def _wait(key, lock_key):
+    deadline = time.monotonic() + settings.SWR_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        if cache.get(lock_key) is None:
+            return None
+    return None
+
+
+def get_or_compute(key, compute, timeout):
+    """
+    Return the cached value of ``key``, computing it with ``compute()``
+    at most once at a time across the workers.
+    """
+    entry = cache.get(key)
+    if entry is not None and _is_fresh(entry[1], entry[2]):
+        return entry[0]
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, True, settings.SWR_LOCK_TIMEOUT):
+        if entry is None:
+            entry = _wait(key, lock_key)
+        if entry is not None:
+            return entry[0]
+        # The lock holder failed or is too slow: compute it here.
+        return _store(key, compute, timeout)
+    try:
+        return _store(key, compute, timeout)
+    finally:
+        cache.delete(lock_key)
+
+
+def is_cacheable(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        and not request.META.get('CSRF_COOKIE_USED')
+    )
@@ -0,0 +1,260 @@
+"""
+Minimal background task queue.
+
+Functions decorated with ``@task`` are queued with ``.delay()`` or
+``.enqueue()`` and executed by the backend chosen in
+``settings.TASKS_BACKEND``:
+
+* ``eager`` runs the task immediately in the caller, for tests;
+* ``local`` runs it in a thread pool of the current process after the
+  transaction commits, for development;
+* ``database`` stores it in the ``core.Job`` table, where it is picked up
+  by ``python manage.py runworker``.
+"""
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class Task:
+    def __init__(self, func, priority=0, max_retries=3, retry_delay=30):
+        self.func = func
+        self.name = f'{func.__module__}.{func.__qualname__}'
+        self.priority = priority
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, *args, **kwargs):
+        return self.enqueue(args, kwargs)
+
+    def enqueue(self, args=(), kwargs=None, priority=None, countdown=None,
+                eta=None):
+        run_at = eta or timezone.now()
+        if countdown:
+            run_at += timedelta(seconds=countdown)
+        job = QueuedTask(
+            name=self.name,
+            args=list(args),
+            kwargs=kwargs or {},
+            priority=self.priority if priority is None else priority,
+            run_at=run_at,
+            max_retries=self.max_retries,
+        )
+        get_backend().enqueue(job)
+        return job
+
+    def retry_countdown(self, attempt):
+        """Exponential backoff between attempts."""
+        return self.retry_delay * 2 ** (attempt - 1)
+
+
+def task(func=None, **options):
+    """Register a function as a background task."""
+    if func is None:
+        return lambda func: Task(func, **options)
+    return Task(func, **options)
+
+
+class QueuedTask:
+    def __init__(self, name, args, kwargs, priority, run_at, max_retries,
+                 attempts=0):
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+        self.priority = priority
+        self.run_at = run_at
+        self.max_retries = max_retries
+        self.attempts = attempts
+
+    @property
+    def task(self):
+        return import_string(self.name)
+
+    def run(self):
+        self.attempts += 1
+        return self.task.func(*self.args, **self.kwargs)
+
+    @property
+    def can_retry(self):
+        return self.attempts <= self.max_retries
+
+
+class EagerBackend:
+    def enqueue(self, job):
+        while True:
+            try:
+                return job.run()
+            except Exception:
+                if not job.can_retry:
+                    raise
+
+
+class LocalBackend:
+    """
+    In-process scheduler: a heap ordered by run time and priority served by
+    a small pool of daemon threads.
+    """
+    def __init__(self, workers=None):
+        self.workers = workers or settings.TASKS_WORKERS
+        self._heap = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._threads = []
+
+    def enqueue(self, job):
+        transaction.on_commit(lambda: self.schedule(job))
+
+    def schedule(self, job):
+        with self._condition:
+            if not self._threads:
+                self._start()
+            heapq.heappush(self._heap, (
+                job.run_at.timestamp(), -job.priority,
+                next(self._counter), job
+            ))
+            self._condition.notify()
+
+    def _start(self):
+        for number in range(self.workers):
+            thread = threading.Thread(
+                target=self._work, name=f'tasks-{number}', daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _next_job(self):
+        with self._condition:
+            while True:
+                if self._heap:
+                    delay = self._heap[0][0] - time.time()
+                    if delay <= 0:
+                        return heapq.heappop(self._heap)[-1]
+                    self._condition.wait(delay)
+                else:
+                    self._condition.wait()
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            try:
+                job.run()
+            except Exception:
+                logger.exception('Task %s failed', job.name)
+                if job.can_retry:
+                    job.run_at = timezone.now() + timedelta(
+                        seconds=job.task.retry_countdown(job.attempts)
+                    )
+                    self.schedule(job)
+            finally:
+                close_old_connections()
+
+
+class DatabaseBackend:
+    def enqueue(self, job):
+        from .models import Job
+
+        Job.objects.create(
+            name=job.name,
+            payload=json.dumps({'args': job.args, 'kwargs': job.kwargs}),
+            priority=job.priority,
+            run_at=job.run_at,
+            max_retries=job.max_retries,
+        )
+
+    def claim(self, limit):
+        """
+        Mark up to ``limit`` due jobs as running and return them.
+
+        Claiming is a conditional update, so several workers may poll the
+        same table without taking the same job twice.
+        """
+        from .models import Job
+
+        now = timezone.now()
+        candidates = Job.objects.filter(
+            status=Job.QUEUED, run_at__lte=now
+        ).order_by('-priority', 'run_at').values_list('pk', flat=True)
+        claimed = []
+        for pk in candidates[:limit]:
+            updated = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+                status=Job.RUNNING,
+                started_at=now,
+                attempts=F('attempts') + 1
+            )
+            if updated:
+                claimed.append(pk)
+        return claimed
+
+    def requeue_stale(self, timeout):
+        """Return jobs of crashed workers to the queue."""
+        from .models import Job
+
+        return Job.objects.filter(
+            status=Job.RUNNING,
+            started_at__lt=timezone.now() - timedelta(seconds=timeout)
+        ).update(status=Job.QUEUED)
+
+    def execute(self, pk):
+        from .models import Job
+
+        record = Job.objects.get(pk=pk)
+        payload = json.loads(record.payload)
+        job = QueuedTask(
+            name=record.name,
+            args=payload['args'],
+            kwargs=payload['kwargs'],
+            priority=record.priority,
+            run_at=record.run_at,
+            max_retries=record.max_retries,
+            attempts=record.attempts - 1,
+        )
+        try:
+            job.run()
+        except Exception:
+            logger.exception('Task %s failed', job.name)
+            record.error = traceback.format_exc()
+            if job.can_retry:
+                record.status = Job.QUEUED
+                record.run_at = timezone.now() + timedelta(
+                    seconds=job.task.retry_countdown(job.attempts)
+                )
+            else:
+                record.status = Job.FAILED
+            record.save(update_fields=('status', 'run_at', 'error'))
+            return False
+        record.delete()
+        return True
+
+
+BACKENDS = {
+    'eager': EagerBackend,
+    'local': LocalBackend,
+    'database': DatabaseBackend,
+}
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(name=None):
+    name = name or settings.TASKS_BACKEND
+    with _backends_lock:
+        if name not in _backends:
+            _backends[name] = BACKENDS[name]()
+        return _backends[name]
@@ -0,0 +1,14 @@
+from django import template
+from django.utils.html import format_html
+
+from ..idempotency import FIELD_NAME, new_key
+
+register = template.Library()
+
+
+@register.simple_tag
+def idempotency_key():
+    """Hidden field that makes repeated submits of the form harmless."""
+    return format_html(
+        '<input type="hidden" name="{}" value="{}">', FIELD_NAME, new_key()
+    )
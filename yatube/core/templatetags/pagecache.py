@@ -0,0 +1,45 @@
+from django import template
+
+from ..pagecache import hole_marker, is_shell
+
+register = template.Library()
+
+
+class HoleNode(template.Node):
+    def __init__(self, template_name, kwargs):
+        self.template_name = template_name
+        self.kwargs = kwargs
+
+    def render(self, context):
+        template_name = self.template_name.resolve(context)
+        kwargs = {
+            name: value.resolve(context)
+            for name, value in self.kwargs.items()
+        }
+        if is_shell(context.get('request')):
+            return hole_marker(template_name, kwargs)
+        hole = context.template.engine.get_template(template_name)
+        with context.push(**kwargs):
+            return hole.render(context)
+
+
+@register.tag
+def hole(parser, token):
+    """
+    ``{% include %}`` of a part that depends on the user. Cached pages
+    render it for every request, see core/pagecache.py; the arguments
+    must be plain values:
+
+        {% hole 'posts/includes/follow_button.html' author=user_obj.username %}
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(
+            f'"{bits[0]}" tag takes at least one argument.'
+        )
+    kwargs = template.base.token_kwargs(bits[2:], parser)
+    if len(kwargs) != len(bits) - 2:
+        raise template.TemplateSyntaxError(
+            f'"{bits[0]}" tag takes only keyword arguments after the name.'
+        )
+    return HoleNode(parser.compile_filter(bits[1]), kwargs)
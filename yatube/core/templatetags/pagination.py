@@ -0,0 +1,11 @@
+from django import template
+
+from ..paginator import page_window as get_page_window
+
+register = template.Library()
+
+
+@register.simple_tag
+def page_window(page_obj, on_each_side=2, on_ends=1):
+    """Page numbers for the navigation, None marks a gap."""
+    return get_page_window(page_obj, on_each_side, on_ends)
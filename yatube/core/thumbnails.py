@@ -0,0 +1,182 @@
+"""
+Key-value store of sorl-thumbnail with lookups batched per page.
+
+``{% thumbnail %}`` looks up every thumbnail separately, a cache request
+and, for the entries missing from the cache, a database query each. A
+feed page calls ``prefetch_thumbnails()`` for its images first: the
+entries come from the shared cache with one ``get_many``, the ones
+missing there from the database with one query, and the tags are then
+answered from memory until the request ends. The database stays the
+durable copy, the cache is filled from it.
+
+Every lookup is counted as answered from the cache, from the database or
+not found. The counts of a request are kept in memory and added to the
+counters in the shared cache once, when the request ends;
+``manage.py thumbnail_stats`` shows the hit rates.
+"""
+import threading
+from collections import Counter
+
+from django.core.signals import request_finished
+from sorl.thumbnail import default
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.kvstores.cached_db_kvstore import EMPTY_VALUE
+from sorl.thumbnail.kvstores.cached_db_kvstore import KVStore as CachedDBStore
+from sorl.thumbnail.models import KVStore as KVStoreModel
+
+STATS = ('cache', 'database', 'miss')
+STATS_KEY = 'thumbnail:kvstore:{}'
+
+_prefetched = threading.local()
+_counts = threading.local()
+
+
+def forget_prefetched(**kwargs):
+    _prefetched.__dict__.clear()
+
+
+def flush_stats(**kwargs):
+    """Add the lookups counted by this thread to the shared counters."""
+    counts = getattr(_counts, 'counter', None)
+    if not counts:
+        return
+    _counts.counter = Counter()
+    cache = default.kvstore.cache
+    for name, value in counts.items():
+        if not value:
+            continue
+        key = STATS_KEY.format(name)
+        if cache.add(key, value, None):
+            continue
+        try:
+            cache.incr(key, value)
+        except ValueError:
+            # Evicted between add() and incr().
+            cache.set(key, value, None)
+
+
+request_finished.connect(forget_prefetched)
+request_finished.connect(flush_stats)
+
+
+def thumbnail_key(file_, geometry, **options):
+    """
+    Return the store key of the thumbnail that ``get_thumbnail()`` with
+    the same arguments looks up.
+    """
+    backend = default.backend
+    source = ImageFile(file_)
+    if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for name, value in backend.default_options.items():
+        options.setdefault(name, value)
+    for name, attr in backend.extra_options:
+        value = getattr(thumbnail_settings, attr)
+        if value != getattr(default_settings, attr):
+            options.setdefault(name, value)
+    name = backend._get_thumbnail_filename(source, geometry, options)
+    return add_prefix(ImageFile(name, default.storage).key)
+
+
+def prefetch_thumbnails(files, renditions):
+    """
+    Load the store entries of the thumbnails of ``files`` in ``renditions``,
+    pairs of geometry and options, for the thumbnail tags that follow.
+    """
+    if not hasattr(default.kvstore, 'prefetch'):
+        return
+    default.kvstore.prefetch(
+        thumbnail_key(file_, geometry, **options)
+        for file_ in files if file_
+        for geometry, options in renditions
+    )
+
+
+class KVStore(CachedDBStore):
+    def prefetch(self, keys):
+        keys = set(keys)
+        values = self.cache.get_many(keys)
+        counts = Counter(
+            cache=sum(value != EMPTY_VALUE for value in values.values())
+        )
+        missing = keys - values.keys()
+        if missing:
+            stored = dict(
+                KVStoreModel.objects.filter(key__in=missing)
+                .values_list('key', 'value')
+            )
+            counts['database'] = len(stored)
+            # Entries missing from the database are cached as missing too,
+            # as the parent store does.
+            self.cache.set_many(
+                {key: stored.get(key, EMPTY_VALUE) for key in missing},
+                thumbnail_settings.THUMBNAIL_CACHE_TIMEOUT
+            )
+            values.update(stored)
+        found = {
+            key: value for key, value in values.items()
+            if value != EMPTY_VALUE
+        }
+        counts['miss'] = len(keys) - len(found)
+        _prefetched.values = found
+        _prefetched.missing = keys - found.keys()
+        self._count(counts)
+
+    def _get_raw(self, key):
+        found = getattr(_prefetched, 'values', {})
+        if key in found:
+            return found.pop(key)
+        missing = getattr(_prefetched, 'missing', set())
+        if key in missing:
+            missing.discard(key)
+            return None
+        value = self.cache.get(key)
+        if value is None:
+            try:
+                value = KVStoreModel.objects.get(key=key).value
+                self._count({'database': 1})
+            except KVStoreModel.DoesNotExist:
+                value = EMPTY_VALUE
+            self.cache.set(
+                key, value, thumbnail_settings.THUMBNAIL_CACHE_TIMEOUT
+            )
+        elif value != EMPTY_VALUE:
+            self._count({'cache': 1})
+        if value == EMPTY_VALUE:
+            self._count({'miss': 1})
+            return None
+        return value
+
+    def _set_raw(self, key, value):
+        self._forget(key)
+        super()._set_raw(key, value)
+
+    def _delete_raw(self, *keys):
+        self._forget(*keys)
+        super()._delete_raw(*keys)
+
+    def _forget(self, *keys):
+        for key in keys:
+            getattr(_prefetched, 'values', {}).pop(key, None)
+            getattr(_prefetched, 'missing', set()).discard(key)
+
+    def _count(self, counts):
+        if not hasattr(_counts, 'counter'):
+            _counts.counter = Counter()
+        _counts.counter.update(counts)
+
+    def stats(self):
+        """Return the number of lookups by where they were answered."""
+        flush_stats()
+        keys = {STATS_KEY.format(name): name for name in STATS}
+        values = self.cache.get_many(keys)
+        return {
+            name: values.get(key, 0) for key, name in keys.items()
+        }
+
+    def reset_stats(self):
+        _counts.__dict__.clear()
+        self.cache.delete_many([STATS_KEY.format(name) for name in STATS])
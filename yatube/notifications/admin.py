@@ -0,0 +1,22 @@
+from django.contrib import admin
+
+from .models import Notification
+
+
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'recipient',
+        'kind',
+        'actor',
+        'is_read',
+        'created',
+    )
+    list_filter = ('kind', 'is_read')
+    raw_id_fields = (
+        'recipient', 'actor', 'post', 'archived_post', 'comment'
+    )
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(Notification, NotificationAdmin)
@@ -0,0 +1,14 @@
+from django.utils.functional import SimpleLazyObject
+
+from .unread import get_unread_count
+
+
+def unread_notifications(request):
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {
+        'unread_notifications': SimpleLazyObject(
+            lambda: get_unread_count(user.pk)
+        )
+    }
@@ -0,0 +1,76 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+from posts.models import ArchivedPost, Comment, Post
+
+User = get_user_model()
+
+
+class NotificationQuerySet(models.QuerySet):
+    def visible(self):
+        """Notifications about posts that are not deleted."""
+        return self.filter(post__deleted_at=None)
+
+
+class Notification(models.Model):
+    NEW_POST = 'post'
+    NEW_COMMENT = 'comment'
+    KIND_CHOICES = (
+        (NEW_POST, 'Новый пост'),
+        (NEW_COMMENT, 'Новый комментарий'),
+    )
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications'
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    # Exactly one of post and archived_post is set, see posts/archive.py.
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+        null=True
+    )
+    archived_post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='+',
+        blank=True,
+        null=True
+    )
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.CASCADE,
+        related_name='+',
+        blank=True,
+        null=True
+    )
+    is_read = models.BooleanField(default=False)
+    created = models.DateTimeField(auto_now_add=True)
+
+    objects = NotificationQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Уведомление'
+        verbose_name_plural = 'Уведомления'
+        ordering = ('-created',)
+        indexes = [
+            models.Index(
+                fields=['recipient', 'is_read'],
+                name='notification_unread_idx'
+            ),
+        ]
+
+    @property
+    def target(self):
+        """The post the notification is about, hot or archived."""
+        return self.post or self.archived_post
+
+    def __str__(self):
+        return f'{self.get_kind_display()} для {self.recipient}'
@@ -0,0 +1,25 @@
+from django.db.models import F
+from django.dispatch import receiver
+
+from core.signals import archived, soft_deleted
+from posts.models import Post
+
+from .models import Notification
+from .unread import forget_unread_counts
+
+
+@receiver(soft_deleted, sender=Post)
+def posts_soft_deleted(sender, pks, **kwargs):
+    # Notifications about deleted posts are no longer counted as unread.
+    forget_unread_counts(set(
+        Notification.objects.filter(post_id__in=pks, is_read=False)
+        .values_list('recipient_id', flat=True)
+    ))
+
+
+@receiver(archived, sender=Post)
+def posts_archived(sender, pks, **kwargs):
+    # Moved to the archived posts, or deleting the hot rows would cascade.
+    Notification.objects.filter(post_id__in=pks).update(
+        archived_post_id=F('post_id'), post=None, comment=None
+    )
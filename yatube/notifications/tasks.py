@@ -0,0 +1,53 @@
+from django.conf import settings
+
+from core.tasks import task
+from posts.models import Comment, Follow, Post
+
+from .models import Notification
+from .unread import forget_unread_counts
+
+
+@task
+def notify_post_author(comment_id):
+    comment = Comment.objects.select_related('post').filter(
+        pk=comment_id
+    ).first()
+    if comment is None or comment.author_id == comment.post.author_id:
+        return
+    Notification.objects.create(
+        recipient_id=comment.post.author_id,
+        actor_id=comment.author_id,
+        kind=Notification.NEW_COMMENT,
+        post_id=comment.post_id,
+        comment_id=comment.pk
+    )
+    forget_unread_counts([comment.post.author_id])
+
+
+@task
+def notify_followers(post_id, after_user_id=0):
+    """
+    Notify one batch of the author's followers about a new post and queue
+    the next batch, so a popular author never blocks a worker for long.
+    """
+    author_id = Post.objects.filter(pk=post_id).values_list(
+        'author_id', flat=True
+    ).first()
+    if author_id is None:
+        return
+    batch_size = settings.NOTIFICATIONS_BATCH_SIZE
+    follower_ids = list(
+        Follow.objects.filter(author_id=author_id, user_id__gt=after_user_id)
+        .order_by('user_id').values_list('user_id', flat=True)[:batch_size]
+    )
+    Notification.objects.bulk_create([
+        Notification(
+            recipient_id=user_id,
+            actor_id=author_id,
+            kind=Notification.NEW_POST,
+            post_id=post_id
+        ) for user_id in follower_ids
+    ])
+    forget_unread_counts(follower_ids)
+    if len(follower_ids) == batch_size:
+        notify_followers.delay(post_id, after_user_id=follower_ids[-1])
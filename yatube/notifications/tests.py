@@ -0,0 +1,126 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.archive import archive_cutoff, archive_posts
+from posts.models import Follow, Post
+
+from .models import Notification
+from .unread import get_unread_count
+
+User = get_user_model()
+
+
+@override_settings(TASKS_BACKEND='eager', NOTIFICATIONS_BATCH_SIZE=2)
+class NotificationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.followers = [
+            User.objects.create_user(username=f'follower_{i}')
+            for i in range(3)
+        ]
+        Follow.objects.bulk_create([
+            Follow(user=user, author=cls.author) for user in cls.followers
+        ])
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(NotificationTests.author)
+        self.follower_client = Client()
+        self.follower_client.force_login(NotificationTests.followers[0])
+
+    def test_new_post_notifies_all_followers_in_batches(self):
+        """Новый пост создает уведомления для всех подписчиков."""
+        self.author_client.post(
+            reverse('posts:post_create'), {'text': 'Новый пост'}
+        )
+        recipients = set(
+            Notification.objects.filter(kind=Notification.NEW_POST)
+            .values_list('recipient', flat=True)
+        )
+        self.assertEqual(
+            recipients, {user.pk for user in NotificationTests.followers}
+        )
+
+    def test_comment_notifies_post_author(self):
+        """Комментарий создает уведомление автору поста."""
+        post = Post.objects.create(
+            text='Пост', author=NotificationTests.author
+        )
+        self.follower_client.post(
+            reverse('posts:add_comment', args=(post.pk,)),
+            {'text': 'Комментарий'}
+        )
+        notification = Notification.objects.get(
+            kind=Notification.NEW_COMMENT
+        )
+        self.assertEqual(notification.recipient, NotificationTests.author)
+        self.assertEqual(notification.post, post)
+
+    def test_unread_badge_is_cached_and_reset(self):
+        """Счетчик непрочитанных кэшируется и сбрасывается на странице."""
+        post = Post.objects.create(
+            text='Пост', author=NotificationTests.author
+        )
+        Notification.objects.create(
+            recipient=NotificationTests.followers[0],
+            actor=NotificationTests.author,
+            kind=Notification.NEW_POST,
+            post=post
+        )
+        response = self.follower_client.get(reverse('posts:index'))
+        self.assertEqual(response.context['unread_notifications'], 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                get_unread_count(NotificationTests.followers[0].pk), 1
+            )
+        response = self.follower_client.get(reverse('notifications:index'))
+        # The page that shows the notifications has the badge reset.
+        self.assertEqual(response.context['unread_notifications'], 0)
+        self.assertContains(response, 'fw-bold')
+        response = self.follower_client.get(reverse('posts:index'))
+        self.assertEqual(response.context['unread_notifications'], 0)
+        self.assertFalse(
+            Notification.objects.filter(is_read=False).exists()
+        )
+
+    @override_settings(TASKS_BACKEND='database')
+    def test_deleted_posts_are_not_counted(self):
+        """Уведомления об удаленных постах не попадают в счетчик."""
+        follower = NotificationTests.followers[0]
+        post = Post.objects.create(
+            text='Пост', author=NotificationTests.author
+        )
+        Notification.objects.create(
+            recipient=follower, actor=NotificationTests.author,
+            kind=Notification.NEW_POST, post=post
+        )
+        self.assertEqual(get_unread_count(follower.pk), 1)
+        post.delete()
+        self.assertEqual(get_unread_count(follower.pk), 0)
+
+    def test_archived_posts_keep_notifications(self):
+        """Уведомления переносятся в архив вместе с постом."""
+        follower = NotificationTests.followers[0]
+        post = Post.objects.create(
+            text='Старый пост', author=NotificationTests.author
+        )
+        Notification.objects.create(
+            recipient=follower, actor=NotificationTests.author,
+            kind=Notification.NEW_POST, post=post
+        )
+        archive_posts(archive_cutoff(-1))
+        notification = Notification.objects.get()
+        self.assertIsNone(notification.post)
+        self.assertEqual(notification.target.pk, post.pk)
+        self.assertEqual(get_unread_count(follower.pk), 1)
+        response = self.follower_client.get(
+            reverse('notifications:index')
+        )
+        self.assertContains(
+            response, reverse('posts:post_detail', args=(post.pk,))
+        )
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Notification
+
+
+def _key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def get_unread_count(user_id):
+    count = cache.get(_key(user_id))
+    if count is None:
+        count = Notification.objects.visible().filter(
+            recipient_id=user_id, is_read=False
+        ).count()
+        cache.set(_key(user_id), count, settings.NOTIFICATIONS_UNREAD_TIMEOUT)
+    return count
+
+
+def forget_unread_counts(user_ids):
+    cache.delete_many([_key(user_id) for user_id in user_ids])
+
+
+def mark_all_read(user_id):
+    Notification.objects.filter(
+        recipient_id=user_id, is_read=False
+    ).update(is_read=True)
+    cache.set(_key(user_id), 0, settings.NOTIFICATIONS_UNREAD_TIMEOUT)
@@ -0,0 +1,20 @@
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import render
+
+from posts.views import paginator
+
+from .unread import mark_all_read
+
+
+@login_required
+def notification_list(request):
+    notifications = request.user.notifications.visible().select_related(
+        'actor', 'post', 'archived_post'
+    )
+    page_obj = paginator(request, notifications)
+    # Loaded before they are marked, so the page still shows the new ones.
+    page_obj.object_list = list(page_obj.object_list)
+    mark_all_read(request.user.pk)
+    return render(request, 'notifications/index.html', {
+        'page_obj': page_obj,
+    })
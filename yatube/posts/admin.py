@@ -1,9 +1,134 @@
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db.models import Max, Min
+from django.forms.models import BaseModelFormSet
+from django.shortcuts import render
 
+from core.paginator import AdminPaginator
+
+from . import moderation, search
+from .feeds import deferred_group_updates
+from .forms import MoveToGroupForm, PeriodForm
 from .models import Group, Post, Comment, Follow
 
 
-class PostAdmin(admin.ModelAdmin):
+class FullTextSearchMixin:
+    """Search the text of large tables through the full-text index."""
+    def get_search_results(self, request, queryset, search_term):
+        if search_term and search.is_available(queryset):
+            return search.search(queryset, search_term), False
+        return super().get_search_results(request, queryset, search_term)
+
+
+class ModerationActionsMixin:
+    """Bulk actions that delete content of spam authors or of a period."""
+    actions = ('delete_by_authors', 'purge_period')
+
+    def _confirm(self, request, queryset, form, description):
+        return render(request, 'admin/posts/moderation.html', {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': description,
+            'description': description,
+            'form': form,
+            'action': request.POST['action'],
+            'selected': request.POST.getlist(helpers.ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+        })
+
+    def _run(self, request, operation, size, **kwargs):
+        background = size > settings.MODERATION_BACKGROUND_THRESHOLD
+        done = moderation.run(operation, background, **kwargs)
+        if done is None:
+            self.message_user(
+                request,
+                f'Обработка {size} записей запущена в фоне.',
+                messages.INFO
+            )
+        else:
+            self.message_user(request, f'Обработано записей: {done}.')
+
+    def delete_by_authors(self, request, queryset):
+        author_ids = list(
+            queryset.values_list('author_id', flat=True).distinct()
+        )
+        size = self.model.objects.filter(author_id__in=author_ids).count()
+        self._run(
+            request, 'delete_by_authors', size,
+            model=self.model._meta.model_name, author_ids=author_ids
+        )
+    delete_by_authors.short_description = (
+        'Удалить все записи авторов выбранных записей'
+    )
+
+    def purge_period(self, request, queryset):
+        form = PeriodForm(request.POST if 'apply' in request.POST else None)
+        if not form.is_bound:
+            form.initial = queryset.aggregate(
+                start=Min('pub_date'), end=Max('pub_date')
+            )
+        if not form.is_valid():
+            return self._confirm(
+                request, queryset, form, 'Удаление всех записей за период'
+            )
+        start, end = form.cleaned_data['start'], form.cleaned_data['end']
+        size = self.model.objects.filter(
+            pub_date__gte=start, pub_date__lte=end
+        ).count()
+        self._run(
+            request, 'purge_period', size,
+            model=self.model._meta.model_name,
+            start=start.isoformat(), end=end.isoformat()
+        )
+    purge_period.short_description = 'Удалить все записи за период'
+
+
+class PrefetchedAutocompleteSelect(AutocompleteSelect):
+    """Autocomplete widget rendering its selected option from a given map."""
+    def __init__(self, widget, labels):
+        super().__init__(widget.rel, widget.admin_site, widget.attrs,
+                         widget.choices, widget.db)
+        self.labels = labels
+
+    def optgroups(self, name, value, attr=None):
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        for pk in value:
+            if pk in self.labels:
+                options.append(self.create_option(
+                    name, pk, self.labels[pk], True, len(options)
+                ))
+                break
+        return [(None, options, 0)]
+
+
+class GroupChoicesFormSet(BaseModelFormSet):
+    """
+    Changelist formset whose autocomplete group widgets share the groups of
+    the page, loaded with one query instead of one query per editable row.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.forms:
+            return
+        field = self.forms[0].fields['group']
+        ids = {form['group'].value() for form in self.forms} - {None, ''}
+        labels = {
+            str(group.pk): field.label_from_instance(group)
+            for group in field.queryset.filter(pk__in=ids)
+        }
+        for form in self.forms:
+            field = form.fields['group']
+            field.widget.widget = PrefetchedAutocompleteSelect(
+                field.widget.widget, labels
+            )
+
+
+class PostAdmin(ModerationActionsMixin, FullTextSearchMixin,
+                admin.ModelAdmin):
     list_display = (
         'pk',
         'text',
@@ -11,11 +136,43 @@ class PostAdmin(admin.ModelAdmin):
         'author',
         'group'
     )
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
     list_editable = ('group',)
+    date_hierarchy = 'pub_date'
+    autocomplete_fields = ('author', 'group')
+    paginator = AdminPaginator
+    show_full_result_count = False
     empty_value_display = '-пусто-'
 
+    actions = ('move_to_group',) + ModerationActionsMixin.actions
+
+    def get_changelist_formset(self, request, **kwargs):
+        kwargs['formset'] = GroupChoicesFormSet
+        return super().get_changelist_formset(request, **kwargs)
+
+    def changelist_view(self, request, extra_context=None):
+        # Rows saved through list_editable update the group feeds once.
+        with deferred_group_updates():
+            return super().changelist_view(request, extra_context)
+
+    def move_to_group(self, request, queryset):
+        form = MoveToGroupForm(
+            request.POST if 'apply' in request.POST else None
+        )
+        if not form.is_valid():
+            return self._confirm(
+                request, queryset, form, 'Перенос постов в группу'
+            )
+        group = form.cleaned_data['group']
+        post_ids = list(queryset.values_list('pk', flat=True))
+        self._run(
+            request, 'move_posts', len(post_ids),
+            post_ids=post_ids, group_id=group.pk if group else None
+        )
+    move_to_group.short_description = 'Перенести выбранные посты в группу'
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = (
@@ -28,14 +185,20 @@ class GroupAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(ModerationActionsMixin, FullTextSearchMixin,
+                   admin.ModelAdmin):
     list_display = (
         'post',
         'author',
         'text',
     )
+    list_select_related = ('post', 'author')
     search_fields = ('text',)
     list_editable = ('text',)
+    date_hierarchy = 'pub_date'
+    autocomplete_fields = ('post', 'author')
+    paginator = AdminPaginator
+    show_full_result_count = False
     empty_value_display = '-пусто-'
 
 
@@ -44,7 +207,9 @@ class FollowAdmin(admin.ModelAdmin):
         'user',
         'author',
     )
-    search_fields = ('author',)
+    list_select_related = ('user', 'author')
+    search_fields = ('author__username',)
+    autocomplete_fields = ('user', 'author')
     empty_value_display = '-пусто-'
 
 
@@ -1,5 +1,19 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def ensure_search_schema(using, **kwargs):
+    from django.db import connections
+
+    from .search import ensure_schema
+
+    ensure_schema(connections[using])
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from . import holes, signals  # noqa: F401
+
+        post_migrate.connect(ensure_search_schema, sender=self)
@@ -0,0 +1,140 @@
+"""
+Archive of old posts.
+
+Posts older than ARCHIVE_AFTER_DAYS are moved with their comments from the
+hot tables to ArchivedPost and ArchivedComment, so the feeds sort and count
+only recent rows. Archived posts keep their ids: the post page and the
+deep pages of a profile serve them transparently, read only.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from core import media
+from core.signals import archived
+from core.paginator import approximate_count
+
+from .feeds import deferred_group_updates
+from .moderation import _chunks
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+
+def archive_cutoff(days=None):
+    days = settings.ARCHIVE_AFTER_DAYS if days is None else days
+    return timezone.now() - timedelta(days=days)
+
+
+def _archive_chunk(ids):
+    posts = list(Post.objects.filter(pk__in=ids))
+    # The archived rows keep the images the hot rows release on delete.
+    media.acquire(*(post.image.name for post in posts))
+    ArchivedPost.objects.bulk_create(
+        ArchivedPost(
+            id=post.pk,
+            pub_date=post.pub_date,
+            text=post.text,
+            author_id=post.author_id,
+            group_id=post.group_id,
+            image=post.image.name,
+            image_placeholder=post.image_placeholder,
+            version=post.version,
+        ) for post in posts
+    )
+    ArchivedComment.objects.bulk_create(
+        ArchivedComment(
+            id=comment.pk,
+            pub_date=comment.pub_date,
+            post_id=comment.post_id,
+            author_id=comment.author_id,
+            text=comment.text,
+        ) for comment in Comment.objects.filter(post_id__in=ids)
+    )
+    archived.send(sender=Post, pks=ids)
+    Post.all_objects.filter(pk__in=ids).hard_delete()
+    return len(ids)
+
+
+def archive_posts(before):
+    """Move the posts published before ``before`` to the archive."""
+    archived = 0
+    with deferred_group_updates():
+        for ids in _chunks(Post.objects.filter(pub_date__lt=before)):
+            with transaction.atomic():
+                archived += _archive_chunk(ids)
+    return archived
+
+
+def purge_archived(**filters):
+    """
+    Remove the archived posts and comments matching ``filters`` in chunks,
+    like ``purge_deleted()`` does for the hot tables.
+    """
+    purged = 0
+    for model in (ArchivedComment, ArchivedPost):
+        for ids in _chunks(model.objects.filter(**filters)):
+            with transaction.atomic():
+                purged += model.objects.filter(pk__in=ids).delete()[1].get(
+                    model._meta.label, 0
+                )
+    return purged
+
+
+def get_post_or_404(post_id):
+    """Return the post from the hot table or from the archive."""
+    post = Post.objects.select_related('group').filter(pk=post_id).first()
+    if post is None:
+        # Archived posts are not soft deleted with their author's account.
+        post = ArchivedPost.objects.select_related('group').filter(
+            pk=post_id, author__is_active=True
+        ).first()
+    if post is None:
+        raise Http404('No post matches the given query.')
+    return post
+
+
+class ProfileFeed:
+    """
+    Posts of an author for the Paginator: the hot posts first, then the
+    archived ones, which are all older.
+    """
+    def __init__(self, author):
+        self.hot = author.posts.select_related('group')
+        self.archived = author.archived_posts.select_related('group')
+
+    @cached_property
+    def hot_count(self):
+        return self.hot.count()
+
+    @cached_property
+    def archived_count(self):
+        return self.archived.count()
+
+    def count(self):
+        return self.hot_count + self.archived_count
+
+    def approximate_count(self):
+        hot, hot_estimated = approximate_count(self.hot)
+        archived, archived_estimated = approximate_count(self.archived)
+        return hot + archived, hot_estimated or archived_estimated
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start = key.start or 0
+        stop = self.count() if key.stop is None else key.stop
+        # The hot posts are counted only on the pages past their end.
+        posts = list(self.hot[start:stop])
+        if len(posts) == stop - start:
+            return posts
+        if posts:
+            self.hot_count = start + len(posts)
+        return posts + list(self.archived[
+            max(start - self.hot_count, 0):stop - self.hot_count
+        ])
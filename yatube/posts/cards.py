@@ -0,0 +1,50 @@
+"""
+Rendering of the post cards shown in the feeds.
+
+A card depends only on the post and its author, not on the viewer, so it
+is rendered once per post version and reused by every feed page. The
+version changes when the post is saved or moved, when its group's slug
+changes and when the author's name changes (see ``signals.py``).
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+
+from .models import ArchivedPost, Post, new_feed_version
+
+CARD_TEMPLATE = 'posts/includes/post_list.html'
+
+
+def card_key(post):
+    return f'post:card:{post.pk}:{post.version}'
+
+
+def get_cached_cards(posts):
+    """Return ``{post id: html}`` of the cached cards with one request."""
+    if not settings.POST_CARD_CACHE:
+        return {}
+    keys = {card_key(post): post.pk for post in posts}
+    return {
+        keys[key]: html for key, html in cache.get_many(keys).items()
+    }
+
+
+def render_card(post, get_author):
+    """
+    Render the card of a post and cache it. ``get_author`` returns the
+    user card of the author.
+    """
+    html = get_template(CARD_TEMPLATE).render({
+        'post': post,
+        'author': get_author(),
+    })
+    if settings.POST_CARD_CACHE:
+        cache.set(card_key(post), html, settings.POST_CARD_TIMEOUT)
+    return html
+
+
+def refresh_cards(**filters):
+    """Give the matching posts a new version so their cards render anew."""
+    version = new_feed_version()
+    ArchivedPost.objects.filter(**filters).update(version=version)
+    return Post.objects.filter(**filters).update(version=version)
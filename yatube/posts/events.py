@@ -0,0 +1,124 @@
+"""
+Server-Sent Events for the post feeds and the post page.
+
+An event source describes one channel and turns its messages into SSE
+frames. The same sources are driven by the WSGI views in ``views.py`` and
+by the asynchronous application in ``yatube/asgi.py``.
+"""
+import json
+import time
+
+from django.conf import settings
+
+from core.pubsub import get_pubsub
+
+from .models import Follow, Post
+
+POSTS_CHANNEL = 'posts'
+
+
+def post_channel(post_id):
+    return f'post:{post_id}'
+
+
+def sse_frame(event, data, event_id=None):
+    frame = f'event: {event}\ndata: {json.dumps(data)}\n\n'
+    if event_id is not None:
+        frame = f'id: {event_id}\n{frame}'
+    return frame
+
+
+class NewPostsSource:
+    """
+    Counts posts published after the page was rendered. The browser keeps
+    ``since`` in the stream URL, so a reconnect recounts from the same
+    point instead of starting over.
+    """
+    def __init__(self, since, author_ids=None):
+        self.channel = POSTS_CHANNEL
+        self.last_id = since
+        self.author_ids = author_ids
+        self.count = 0
+
+    def frames(self, messages):
+        before = self.count
+        for message_id, data in messages:
+            self.last_id = message_id
+            if self.author_ids is None or data['author'] in self.author_ids:
+                self.count += 1
+        if self.count != before:
+            yield sse_frame('posts', {'count': self.count})
+
+
+class CommentsSource:
+    def __init__(self, post_id, since):
+        self.channel = post_channel(post_id)
+        self.last_id = since
+
+    def frames(self, messages):
+        for message_id, data in messages:
+            self.last_id = message_id
+            yield sse_frame('comment', data, event_id=message_id)
+
+
+def feed_source(feed, since, user_id=None):
+    """Build the new posts source for the 'index' or 'follow' feed."""
+    author_ids = None
+    if feed == 'follow':
+        author_ids = set(
+            Follow.objects.filter(user_id=user_id)
+            .values_list('author_id', flat=True)
+        )
+    return NewPostsSource(since, author_ids)
+
+
+def comments_source(post_id, since):
+    """Build the comments source of a post, None if there is no such post."""
+    if not Post.objects.filter(pk=post_id).exists():
+        return None
+    return CommentsSource(post_id, since)
+
+
+def _parse_id(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def parse_since(query_value, last_event_id=None):
+    if last_event_id:
+        return _parse_id(last_event_id)
+    return _parse_id(query_value)
+
+
+def iter_events(source):
+    """
+    Blocking SSE stream for WSGI servers. The connection is closed after
+    SSE_MAX_DURATION seconds and reopened by the browser, which keeps sync
+    workers from being held forever.
+    """
+    backend = get_pubsub()
+    deadline = time.monotonic() + settings.SSE_MAX_DURATION
+    yield f'retry: {settings.SSE_RETRY * 1000}\n\n'
+    while time.monotonic() < deadline:
+        messages = backend.wait(
+            source.channel, source.last_id, settings.SSE_HEARTBEAT
+        )
+        if not messages:
+            yield ': ping\n\n'
+        yield from source.frames(messages)
+
+
+async def aiter_events(source):
+    """The same stream for the ASGI application, without a thread."""
+    backend = get_pubsub()
+    yield f'retry: {settings.SSE_RETRY * 1000}\n\n'
+    while True:
+        messages = await backend.async_wait(
+            source.channel, source.last_id, settings.SSE_HEARTBEAT
+        )
+        if not messages:
+            yield ': ping\n\n'
+        for frame in source.frames(messages):
+            yield frame
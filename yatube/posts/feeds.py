@@ -0,0 +1,151 @@
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.shortcuts import get_object_or_404
+
+from core.swr import get_or_compute
+
+from .models import Group, Post, new_feed_version
+
+GROUPS_GENERATION_KEY = 'groups:generation'
+GROUP_CACHE_SIZE = 256
+
+_groups = OrderedDict()
+_groups_lock = threading.Lock()
+_deferred = threading.local()
+
+
+def get_group_or_404(slug):
+    """
+    Return a group by slug from the in-process cache.
+
+    Entries are tagged with a generation stored in the shared cache, so a
+    group saved or deleted by any worker invalidates every local copy.
+    """
+    generation = cache.get_or_set(
+        GROUPS_GENERATION_KEY, uuid.uuid4().hex, None
+    )
+    with _groups_lock:
+        entry = _groups.get(slug)
+        if entry is not None and entry[0] == generation:
+            _groups.move_to_end(slug)
+            return entry[1]
+    group = get_object_or_404(Group, slug=slug)
+    with _groups_lock:
+        _groups[slug] = (generation, group)
+        _groups.move_to_end(slug)
+        while len(_groups) > GROUP_CACHE_SIZE:
+            _groups.popitem(last=False)
+    return group
+
+
+def invalidate_groups():
+    cache.set(GROUPS_GENERATION_KEY, uuid.uuid4().hex, None)
+    with _groups_lock:
+        _groups.clear()
+
+
+def touch_groups(*group_ids, delta=0):
+    """
+    Give the groups a new feed version and shift their post counters.
+
+    Both live on the group row and change in the same transaction as the
+    posts, so a rolled back write never leaves the cached feed stale.
+    """
+    group_ids = [pk for pk in group_ids if pk]
+    if not group_ids or _defer(group_ids):
+        return
+    Group.objects.filter(pk__in=group_ids).update(
+        posts_count=F('posts_count') + delta,
+        posts_version=new_feed_version()
+    )
+
+
+def recount_groups(*group_ids):
+    group_ids = [pk for pk in group_ids if pk]
+    if _defer(group_ids):
+        return
+    for group_id in group_ids:
+        Group.objects.filter(pk=group_id).update(
+            posts_count=Post.objects.filter(group_id=group_id).count(),
+            posts_version=new_feed_version()
+        )
+
+
+def _defer(group_ids):
+    pending = getattr(_deferred, 'group_ids', None)
+    if pending is None:
+        return False
+    pending.update(group_ids)
+    return True
+
+
+@contextmanager
+def deferred_group_updates():
+    """
+    Collect the groups touched inside the block and recount each of them
+    once on exit instead of updating them on every post write.
+    """
+    if getattr(_deferred, 'group_ids', None) is not None:
+        yield
+        return
+    _deferred.group_ids = set()
+    try:
+        yield
+    finally:
+        group_ids, _deferred.group_ids = _deferred.group_ids, None
+        recount_groups(*group_ids)
+
+
+class GroupFeed:
+    """
+    Lazy sequence of group posts for the Paginator.
+
+    The total comes from the group post counter and every page slice is
+    served from a list of post ids cached under the group feed version, so
+    a page costs two primary key lookups and no COUNT(*).
+    """
+    def __init__(self, group):
+        self.group = group
+        self._state = None
+
+    @property
+    def state(self):
+        if self._state is None:
+            self._state = Group.objects.values_list(
+                'posts_count', 'posts_version'
+            ).get(pk=self.group.pk)
+        return self._state
+
+    def count(self):
+        return self.state[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        ids = self._page_ids(key.start or 0, key.stop)
+        posts = Post.objects.select_related('group').in_bulk(ids)
+        return [
+            posts[pk] for pk in ids
+            if pk in posts and posts[pk].group_id == self.group.pk
+        ]
+
+    def _page_ids(self, start, stop):
+        # A new feed version is a miss for every reader at once, so the
+        # ids are computed by one of them.
+        return get_or_compute(
+            f'group:{self.group.pk}:{self.state[1]}:ids:{start}:{stop}',
+            lambda: list(
+                Post.objects.filter(group_id=self.group.pk)
+                .values_list('pk', flat=True)[start:stop]
+            ),
+            settings.GROUP_FEED_TIMEOUT
+        )
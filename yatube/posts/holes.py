@@ -0,0 +1,18 @@
+"""Context of the user dependent parts of the cached post pages."""
+from core.pagecache import hole_context
+
+from .forms import CommentForm
+from .models import Follow
+
+
+@hole_context('posts/includes/follow_button.html')
+def follow_button(request, author):
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user, author__username=author
+    ).exists()
+    return {'following': following}
+
+
+@hole_context('includes/add_comment.html')
+def add_comment(request, post_id):
+    return {'form': CommentForm()}
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.archive import archive_cutoff, archive_posts
+
+
+class Command(BaseCommand):
+    help = 'Переносит старые посты с комментариями в архив.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+            help='Возраст постов в днях, после которого они архивируются.'
+        )
+
+    def handle(self, *args, **options):
+        archived = archive_posts(archive_cutoff(options['days']))
+        self.stdout.write(f'Перенесено в архив постов: {archived}')
@@ -0,0 +1,83 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory
+
+from core.bench import rolled_back
+from posts.archive import archive_cutoff, archive_posts
+from posts.models import Post
+from posts.views import index
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет время главной страницы до и после переноса старых '
+        'постов в архив. Данные создаются во временной транзакции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=50000,
+            help='Число старых постов.'
+        )
+        parser.add_argument(
+            '--recent', type=int, default=1000,
+            help='Число свежих постов.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Число запросов для каждого замера.'
+        )
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self._run(options)
+
+    def _measure(self, request, repeat):
+        timings = []
+        for page in ('1', '50'):
+            request.GET = request.GET.copy()
+            request.GET['page'] = page
+            for _ in range(repeat):
+                cache.clear()
+                started = time.perf_counter()
+                index(request)
+                timings.append(time.perf_counter() - started)
+        return statistics.median(timings) * 1000
+
+    def _run(self, options):
+        author = User.objects.create_user(username='bench_author')
+        old = options['posts']
+        Post.objects.bulk_create(
+            Post(author=author, text=f'Старый пост №{i}') for i in range(old)
+        )
+        Post.objects.filter(author=author).update(
+            pub_date=archive_cutoff() - timedelta(days=1)
+        )
+        Post.objects.bulk_create(
+            Post(author=author, text=f'Новый пост №{i}')
+            for i in range(options['recent'])
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        request = RequestFactory().get('/')
+        request.user = author
+        before = self._measure(request, options['repeat'])
+        started = time.perf_counter()
+        archived = archive_posts(archive_cutoff())
+        took = time.perf_counter() - started
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        after = self._measure(request, options['repeat'])
+        self.stdout.write(
+            f'Главная страница без архива: {before:.2f} мс\n'
+            f'В архив перенесено {archived} постов за {took:.1f} с\n'
+            f'Главная страница с архивом: {after:.2f} мс'
+        )
@@ -0,0 +1,88 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.bench import (STOCK_TEMPLATE_LOADERS, rolled_back,
+                        templates_setting)
+from core.staticfiles import brotli
+from posts.models import Comment, Group, Post
+
+User = get_user_model()
+
+MODES = (
+    ('исходные шаблоны', False, ''),
+    ('шаблоны без отступов', True, ''),
+    ('без отступов и gzip', True, 'gzip'),
+    ('без отступов и brotli', True, 'br'),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет размер ответа и процессорное время на запрос главной '
+        'страницы и страницы поста с шаблонами без отступов и сжатием.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=100,
+            help='Число запросов к каждой странице.'
+        )
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self._run(options['repeat'])
+
+    def _run(self, repeat):
+        author = User.objects.create_user(
+            username='bench_author', first_name='Автор', last_name='Тестов'
+        )
+        group = Group.objects.create(title='Бенчмарк', slug='bench-group')
+        Post.objects.bulk_create(
+            Post(author=author, group=group, text=f'Пост №{i} ' * 20)
+            for i in range(settings.POST_NUMBER)
+        )
+        post = Post.objects.latest('pk')
+        Comment.objects.bulk_create(
+            Comment(post=post, author=author, text=f'Комментарий №{i}')
+            for i in range(20)
+        )
+        pages = (
+            ('index', reverse('posts:index')),
+            ('post_detail', reverse('posts:post_detail', args=[post.pk])),
+        )
+        client = Client()
+        for title, minified, encoding in MODES:
+            if encoding == 'br' and brotli is None:
+                self.stdout.write(f'{title}: пакет brotli не установлен')
+                continue
+            cache.clear()
+            loaders = (
+                settings.TEMPLATE_LOADERS if minified
+                else STOCK_TEMPLATE_LOADERS
+            )
+            with override_settings(
+                DEBUG=False, TEMPLATES=templates_setting(loaders)
+            ):
+                self.stdout.write(title)
+                for name, url in pages:
+                    timings = []
+                    for _ in range(repeat):
+                        # Pages are served from the page cache, as in
+                        # production: the time is mostly the compression.
+                        started = time.process_time()
+                        response = client.get(
+                            url, HTTP_ACCEPT_ENCODING=encoding
+                        )
+                        timings.append(time.process_time() - started)
+                    self.stdout.write(
+                        f'  {name}: {len(response.content)} байт, '
+                        f'{statistics.median(timings) * 1000:.2f} мс '
+                        f'процессора'
+                    )
@@ -0,0 +1,89 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.paginator import Paginator
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.template import engines
+from django.utils import timezone
+
+from core.bench import rolled_back
+from core.paginator import UncountedPaginator
+from posts.models import Post, new_feed_version
+
+User = get_user_model()
+
+# paginator.html before the page window: a link to every page.
+FULL_RANGE = (
+    '{% for i in page_obj.paginator.page_range %}'
+    '{% if page_obj.number == i %}<span>{{ i }}</span>'
+    '{% else %}<a href="?page={{ i }}">{{ i }}</a>{% endif %}'
+    '{% endfor %}'
+)
+
+INSERT_POSTS = '''
+WITH RECURSIVE seq(n) AS (
+    SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s
+)
+INSERT INTO {table} (
+    pub_date, text, author_id, image, image_placeholder, version
+)
+SELECT %s, 'Пост №' || n, %s, '', '', %s FROM seq
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет построение первой страницы большой ленты: подсчёт постов '
+        'и ссылки на все страницы против окна страниц без подсчёта.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=1000000,
+            help='Число постов в ленте.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Число повторов каждого замера.'
+        )
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self._run(options['posts'], options['repeat'])
+
+    def _measure(self, title, paginator_class, template, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            page_obj = paginator_class(Post.objects.all(), 10).get_page(1)
+            # The feed renders the posts of the page as well.
+            list(page_obj)
+            html = template.render({'page_obj': page_obj})
+            timings.append(time.perf_counter() - started)
+        self.stdout.write(
+            f'  {title}: {statistics.median(timings) * 1000:.2f} мс, '
+            f'{len(html)} байт разметки'
+        )
+
+    def _run(self, posts, repeat):
+        author = User.objects.create_user(username='bench_author')
+        with connection.cursor() as cursor:
+            cursor.execute(
+                INSERT_POSTS.format(table=Post._meta.db_table),
+                [posts, timezone.now(), author.pk, new_feed_version()]
+            )
+            # Planner statistics, as a production database keeps them.
+            cursor.execute('ANALYZE')
+        self.stdout.write(f'Первая страница ленты из {posts} постов')
+        engine = engines['django']
+        window = engine.get_template('posts/includes/paginator.html')
+        self._measure(
+            'COUNT(*) и все страницы', Paginator,
+            engine.from_string(FULL_RANGE), repeat
+        )
+        self._measure('COUNT(*) и окно страниц', Paginator, window, repeat)
+        self._measure(
+            'окно страниц без подсчёта', UncountedPaginator, window, repeat
+        )
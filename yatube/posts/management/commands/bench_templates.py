@@ -0,0 +1,91 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.bench import rolled_back, templates_setting
+from posts.models import Follow, Group, Post
+
+User = get_user_model()
+
+
+MODES = (
+    ('без кэша шаблонов', False, False),
+    ('кэширующий загрузчик', True, False),
+    ('загрузчик и кэш карточек', True, True),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет время отрисовки лент постов с кэширующим загрузчиком '
+        'шаблонов и кэшем карточек постов и без них.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=settings.POST_NUMBER,
+            help='Число постов на странице.'
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=50,
+            help='Число запросов к каждой странице.'
+        )
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self._run(options['posts'], options['repeat'])
+
+    def _run(self, posts, repeat):
+        author = User.objects.create_user(
+            username='bench_author', first_name='Автор', last_name='Тестов'
+        )
+        reader = User.objects.create_user(username='bench_reader')
+        group = Group.objects.create(title='Бенчмарк', slug='bench-group')
+        Follow.objects.create(user=reader, author=author)
+        Post.objects.bulk_create(
+            Post(author=author, group=group, text=f'Пост №{i} ' * 20)
+            for i in range(posts)
+        )
+        client = Client()
+        client.force_login(reader)
+        # The page cache is off below, so the index renders for the reader
+        # rather than as an anonymous page shell.
+        index_key = make_template_fragment_key(
+            'index_page', [reader.username, 1, '']
+        )
+        pages = (
+            ('index', reverse('posts:index')),
+            ('group_list', reverse('posts:group_list', args=[group.slug])),
+            ('profile', reverse('posts:profile', args=[author.username])),
+            ('follow_index', reverse('posts:follow_index')),
+        )
+        for title, cached_loader, card_cache in MODES:
+            cache.clear()
+            with override_settings(
+                DEBUG=False,
+                TEMPLATES=templates_setting(
+                    settings.TEMPLATE_LOADERS, cached_loader
+                ),
+                POST_CARD_CACHE=card_cache,
+                PAGE_CACHE_TIMEOUT=0,
+            ):
+                self.stdout.write(title)
+                for name, url in pages:
+                    timings = []
+                    for _ in range(repeat):
+                        # Measure rendering, not the index page fragment.
+                        cache.delete(index_key)
+                        started = time.perf_counter()
+                        client.get(url)
+                        timings.append(time.perf_counter() - started)
+                    self.stdout.write(
+                        f'  {name}: '
+                        f'{statistics.median(timings) * 1000:.2f} мс'
+                    )
@@ -0,0 +1,131 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import connections
+from sorl.thumbnail import default, delete, get_thumbnail
+
+from core.images import image_preview
+from posts.models import ArchivedPost, Post, new_feed_version
+
+PROGRESS_EVERY = 100
+
+
+def init_worker():
+    django.setup()
+    # Forked workers must not share the connections of the parent.
+    connections.close_all()
+
+
+def fill_previews(name):
+    """Store the preview of the image on the posts lacking it."""
+    posts = (
+        Post.all_objects.filter(image=name, image_placeholder=''),
+        ArchivedPost.objects.filter(image=name, image_placeholder=''),
+    )
+    if not any(queryset.exists() for queryset in posts):
+        return
+    with default_storage.open(name) as file:
+        placeholder = image_preview(file)
+    for queryset in posts:
+        queryset.update(
+            image_placeholder=placeholder, version=new_feed_version()
+        )
+
+
+def regenerate(name, force=False):
+    """
+    Render the POST_IMAGE_THUMBNAILS of an image, skipping those already
+    rendered unless ``force``, and fill in the previews of the posts
+    uploaded before they were stored. Return the error or None.
+    """
+    try:
+        fill_previews(name)
+        if force:
+            delete(name, delete_file=False)
+        for geometry, options in settings.POST_IMAGE_THUMBNAILS:
+            thumbnail = get_thumbnail(name, geometry, **options)
+            # get_thumbnail() logs a broken source and returns a thumbnail
+            # that was never stored.
+            if default.kvstore.get(thumbnail) is None:
+                return f'не удалось создать миниатюру {geometry}'
+    except Exception as error:
+        return repr(error)
+    return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт миниатюры всех изображений постов в размерах из '
+        'POST_IMAGE_THUMBNAILS и заполняет превью изображений у постов; '
+        'готовые миниатюры пропускаются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Число процессов; 1 — без пула, в этом процессе.'
+        )
+        parser.add_argument(
+            '--after', default='',
+            help='Продолжить с изображения после указанного.'
+        )
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Пересоздать и уже готовые миниатюры.'
+        )
+
+    def handle(self, *args, **options):
+        names = self._image_names(options['after'])
+        self.stdout.write(f'Изображений: {len(names)}')
+        workers = max(options['workers'] or 1, 1)
+        batch_size = workers * 4
+        done = failed = 0
+        started = time.monotonic()
+        pool = (
+            ProcessPoolExecutor(workers, initializer=init_worker)
+            if workers > 1 else None
+        )
+        try:
+            for start in range(0, len(names), batch_size):
+                batch = names[start:start + batch_size]
+                if pool is None:
+                    errors = [regenerate(name, options['force'])
+                              for name in batch]
+                else:
+                    errors = pool.map(
+                        regenerate, batch, [options['force']] * len(batch)
+                    )
+                for name, error in zip(batch, errors):
+                    if error:
+                        failed += 1
+                        self.stderr.write(f'{name}: {error}')
+                done += len(batch)
+                if done % PROGRESS_EVERY < len(batch):
+                    self.stdout.write(
+                        f'  {done} из {len(names)}, '
+                        f'продолжить: --after {batch[-1]}'
+                    )
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        elapsed = time.monotonic() - started
+        rate = done / elapsed if elapsed else 0
+        self.stdout.write(
+            f'Обработано: {done}, с ошибкой: {failed}, '
+            f'{rate:.1f} изобр./с'
+        )
+
+    @staticmethod
+    def _image_names(after):
+        names = set()
+        for model in (Post.all_objects, ArchivedPost.objects):
+            names.update(
+                model.exclude(image='').filter(image__gt=after)
+                .values_list('image', flat=True)
+            )
+        return sorted(names)
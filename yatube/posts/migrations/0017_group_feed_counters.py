@@ -0,0 +1,33 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:17
+
+from django.db import migrations, models
+import posts.models
+
+
+def count_group_posts(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    for group in Group.objects.all():
+        Group.objects.filter(pk=group.pk).update(
+            posts_count=group.posts.count()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_auto_20220127_1740'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='posts_version',
+            field=models.CharField(default=posts.models.new_feed_version, editable=False, max_length=32),
+        ),
+        migrations.RunPython(count_group_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from posts import search
+
+
+def create_search(apps, schema_editor):
+    search.ensure_schema(schema_editor.connection)
+
+
+def drop_search(apps, schema_editor):
+    search.drop_schema(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_pub_date_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search, drop_search),
+    ]
@@ -1,21 +1,90 @@
+import uuid
+from collections import Counter
+
 from django.contrib.auth import get_user_model
 from django.db import models
 
-from core.models import CreatedModel
+from core import pagecache
+from core.images import image_preview
+from core.models import (CreatedModel, SoftDeleteManager, SoftDeleteModel,
+                         SoftDeleteQuerySet)
 
 User = get_user_model()
 
 
+def new_feed_version():
+    return uuid.uuid4().hex
+
+
 class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=100, unique=True)
     description = models.TextField()
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
+    posts_version = models.CharField(
+        max_length=32,
+        default=new_feed_version,
+        editable=False
+    )
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        # Feed counters are maintained by queries on post writes and must
+        # not be overwritten with a stale in-memory value.
+        if not self._state.adding and not kwargs.get('update_fields'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in ('posts_count', 'posts_version')
+            ]
+        super().save(*args, **kwargs)
+
+
+# Fields shown on a post card: changing them renders the card anew.
+CARD_FIELDS = {'text', 'group', 'group_id', 'image', 'image_placeholder',
+               'pub_date', 'author', 'author_id'}
+
 
-class Post(CreatedModel):
+class PostQuerySet(SoftDeleteQuerySet):
+    """
+    Bulk operations bypass model signals, so they refresh the cached
+    group feeds and pages themselves.
+    """
+    def bulk_create(self, objs, *args, **kwargs):
+        from .feeds import touch_groups
+
+        objs = super().bulk_create(objs, *args, **kwargs)
+        added = Counter(obj.group_id for obj in objs if obj.group_id)
+        for group_id, number in added.items():
+            touch_groups(group_id, delta=number)
+        pagecache.invalidate()
+        return objs
+
+    def update(self, **kwargs):
+        from .feeds import recount_groups
+
+        if CARD_FIELDS & set(kwargs):
+            kwargs.setdefault('version', new_feed_version())
+        if not {'group', 'group_id', 'pub_date'} & set(kwargs):
+            rows = super().update(**kwargs)
+            pagecache.invalidate()
+            return rows
+        group_ids = set(
+            self.exclude(group=None).values_list('group_id', flat=True)
+            .distinct()
+        )
+        rows = super().update(**kwargs)
+        new_group = kwargs.get('group', kwargs.get('group_id'))
+        if new_group is not None:
+            group_ids.add(getattr(new_group, 'pk', new_group))
+        recount_groups(*group_ids)
+        pagecache.invalidate()
+        return rows
+
+
+class Post(CreatedModel, SoftDeleteModel):
     text = models.TextField(
         verbose_name='Текст поста',
         help_text='Введите текст поста'
@@ -40,6 +109,18 @@ class Post(CreatedModel):
         upload_to='posts/',
         blank=True
     )
+    # Filled from the uploaded image, see core/images.py.
+    image_placeholder = models.TextField(blank=True, editable=False)
+    version = models.CharField(
+        max_length=32,
+        default=new_feed_version,
+        editable=False
+    )
+
+    objects = SoftDeleteManager.from_queryset(PostQuerySet)()
+    all_objects = models.Manager.from_queryset(PostQuerySet)()
+
+    is_archived = False
 
     class Meta:
         verbose_name = 'Пост'
@@ -49,8 +130,34 @@ class Post(CreatedModel):
     def __str__(self):
         return self.text[:15]
 
+    def save(self, *args, **kwargs):
+        # A new version on every save makes cached cards of the post stale.
+        self.version = new_feed_version()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'version'}
+        if not self.image:
+            self.image_placeholder = ''
+        elif not self.image._committed:
+            # A new upload, still in memory: preview it before it is stored.
+            try:
+                self.image_placeholder = image_preview(self.image)
+            except OSError:
+                # Not an image Pillow can read: shown without a preview.
+                self.image_placeholder = ''
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored group to detect posts moved between groups
+        # and the image to release the file it replaces.
+        instance._loaded_group_id = instance.__dict__.get('group_id')
+        instance._loaded_image = instance.__dict__.get('image')
+        return instance
 
-class Comment(CreatedModel):
+
+class Comment(CreatedModel, SoftDeleteModel):
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
@@ -70,6 +177,69 @@ class Comment(CreatedModel):
         ordering = ('-pub_date',)
 
 
+class ArchivedPost(models.Model):
+    """
+    Old post moved out of the hot table by ``archive.py``. Archived posts
+    keep their id and are shown read only on the post and profile pages.
+    """
+    id = models.IntegerField(primary_key=True)
+    pub_date = models.DateTimeField(
+        verbose_name='Дата публикации',
+        db_index=True
+    )
+    text = models.TextField(verbose_name='Текст поста')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts'
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts',
+        verbose_name='Группа'
+    )
+    image = models.ImageField(
+        verbose_name='Изображение',
+        upload_to='posts/',
+        blank=True
+    )
+    image_placeholder = models.TextField(blank=True)
+    version = models.CharField(max_length=32)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    is_archived = True
+
+    class Meta:
+        verbose_name = 'Архивный пост'
+        verbose_name_plural = 'Архивные посты'
+        ordering = ('-pub_date',)
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments'
+    )
+    text = models.TextField(verbose_name='Текст комментария')
+
+    class Meta:
+        ordering = ('-pub_date',)
+
+
 class Follow(models.Model):
     user = models.ForeignKey(
         User,
@@ -0,0 +1,105 @@
+"""
+Set-based moderation operations used by the admin actions.
+
+Rows are changed with ``update()``/``delete()`` in chunks of
+MODERATION_CHUNK_SIZE, each chunk in its own transaction so the database
+writer lock is released between them. Group feeds are recounted once at
+the end of an operation. Deleted posts and comments are only hidden and
+are removed later by ``purge_deleted()``.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from .feeds import deferred_group_updates
+from .models import Comment, Post
+
+MODELS = {
+    'post': Post,
+    'comment': Comment,
+}
+
+
+def _chunks(queryset):
+    chunk_size = settings.MODERATION_CHUNK_SIZE
+    last_pk = 0
+    while True:
+        ids = list(
+            queryset.filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', flat=True)[:chunk_size]
+        )
+        if not ids:
+            return
+        yield ids
+        last_pk = ids[-1]
+
+
+def _delete(queryset):
+    deleted = 0
+    with deferred_group_updates():
+        for ids in _chunks(queryset):
+            with transaction.atomic():
+                deleted += queryset.model.objects.filter(
+                    pk__in=ids
+                ).delete()[1].get(queryset.model._meta.label, 0)
+    return deleted
+
+
+def purge_deleted(**filters):
+    """Remove the posts and comments marked as deleted with dependents."""
+    purged = 0
+    for model in (Comment, Post):
+        queryset = model.all_objects.filter(
+            deleted_at__isnull=False, **filters
+        )
+        for ids in _chunks(queryset):
+            with transaction.atomic():
+                purged += model.all_objects.filter(
+                    pk__in=ids
+                ).hard_delete()[1].get(model._meta.label, 0)
+    return purged
+
+
+def move_posts(post_ids, group_id):
+    chunk_size = settings.MODERATION_CHUNK_SIZE
+    post_ids = sorted(post_ids)
+    moved = 0
+    with deferred_group_updates():
+        for start in range(0, len(post_ids), chunk_size):
+            ids = post_ids[start:start + chunk_size]
+            with transaction.atomic():
+                moved += Post.objects.filter(pk__in=ids).update(
+                    group_id=group_id
+                )
+    return moved
+
+
+def delete_by_authors(model, author_ids):
+    return _delete(MODELS[model].objects.filter(author_id__in=author_ids))
+
+
+def purge_period(model, start, end):
+    return _delete(MODELS[model].objects.filter(
+        pub_date__gte=parse_datetime(start),
+        pub_date__lte=parse_datetime(end)
+    ))
+
+
+OPERATIONS = {
+    'move_posts': move_posts,
+    'delete_by_authors': delete_by_authors,
+    'purge_period': purge_period,
+}
+
+
+def run(operation, background, **kwargs):
+    """
+    Run the operation now or, for large selections, queue it and return
+    None.
+    """
+    if background:
+        from .tasks import moderate
+
+        moderate.delay(operation, kwargs)
+        return None
+    return OPERATIONS[operation](**kwargs)
@@ -0,0 +1,142 @@
+"""
+Full-text search over post and comment texts.
+
+SQLite uses FTS5 tables kept in sync by triggers, PostgreSQL a GIN index
+on ``to_tsvector``. Both are created by migration 0019 and checked again
+after every ``migrate``, because SQLite drops the triggers whenever a
+migration rebuilds the table. On other databases or when FTS5 is not
+compiled in, callers fall back to ``icontains``.
+"""
+from django.db import OperationalError, connections
+
+FTS_LANGUAGE = 'russian'
+TABLES = ('posts_post', 'posts_comment')
+
+
+def fts_table(model):
+    return f'{model._meta.db_table}_fts'
+
+
+def sqlite_schema(table):
+    fts = f'{table}_fts'
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+        f"text, content='{table}', content_rowid='id')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, text) VALUES (new.id, new.text); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, text) "
+        f"VALUES ('delete', old.id, old.text); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF text ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, text) "
+        f"VALUES ('delete', old.id, old.text); "
+        f"INSERT INTO {fts}(rowid, text) VALUES (new.id, new.text); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def sqlite_drop_schema(table):
+    fts = f'{table}_fts'
+    return [
+        f'DROP TRIGGER IF EXISTS {fts}_ai',
+        f'DROP TRIGGER IF EXISTS {fts}_ad',
+        f'DROP TRIGGER IF EXISTS {fts}_au',
+        f'DROP TABLE IF EXISTS {fts}',
+    ]
+
+
+def postgresql_schema(table):
+    return [
+        f"CREATE INDEX IF NOT EXISTS {table}_text_fts ON {table} "
+        f"USING gin (to_tsvector('{FTS_LANGUAGE}', text))",
+    ]
+
+
+def postgresql_drop_schema(table):
+    return [f'DROP INDEX IF EXISTS {table}_text_fts']
+
+
+def _execute(connection, statements):
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def _sqlite_schema_ok(connection, table):
+    fts = f'{table}_fts'
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE name IN "
+            "(%s, %s, %s, %s)",
+            [fts, f'{fts}_ai', f'{fts}_ad', f'{fts}_au']
+        )
+        return cursor.fetchone()[0] == 4
+
+
+def ensure_schema(connection):
+    """Create or repair the full-text search structures."""
+    existing = connection.introspection.table_names()
+    for table in TABLES:
+        if table not in existing:
+            continue
+        if connection.vendor == 'postgresql':
+            _execute(connection, postgresql_schema(table))
+        elif connection.vendor == 'sqlite':
+            if _sqlite_schema_ok(connection, table):
+                continue
+            _execute(connection, sqlite_drop_schema(table))
+            try:
+                _execute(connection, sqlite_schema(table))
+            except OperationalError:
+                # SQLite built without FTS5.
+                _execute(connection, sqlite_drop_schema(table))
+
+
+def drop_schema(connection):
+    for table in TABLES:
+        if connection.vendor == 'postgresql':
+            _execute(connection, postgresql_drop_schema(table))
+        elif connection.vendor == 'sqlite':
+            _execute(connection, sqlite_drop_schema(table))
+
+
+def is_available(queryset):
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor != 'sqlite':
+        return False
+    return fts_table(queryset.model) in (
+        connection.introspection.table_names()
+    )
+
+
+def _fts5_query(term):
+    # Every word is quoted so user input cannot break the MATCH syntax;
+    # the trailing star turns words into prefixes.
+    return ' '.join(
+        '"{}"*'.format(word.replace('"', '""')) for word in term.split()
+    )
+
+
+def search(queryset, term):
+    """Filter the queryset by a full-text match on ``text``."""
+    if not term.split():
+        return queryset
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    if connection.vendor == 'postgresql':
+        return queryset.extra(
+            where=[
+                f"to_tsvector('{FTS_LANGUAGE}', {table}.text) @@ "
+                f"plainto_tsquery('{FTS_LANGUAGE}', %s)"
+            ],
+            params=[term]
+        )
+    fts = fts_table(queryset.model)
+    return queryset.extra(
+        where=[
+            f'{table}.id IN (SELECT rowid FROM {fts} WHERE {fts} MATCH %s)'
+        ],
+        params=[_fts5_query(term)]
+    )
@@ -0,0 +1,161 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from core import media, pagecache
+from core.pubsub import publish
+from core.signals import soft_deleted
+from users.cards import forget_cards
+
+from . import events, feeds
+from .cards import refresh_cards
+from .models import ArchivedPost, Comment, Follow, Group, Post
+from .tasks import schedule_purge
+
+User = get_user_model()
+
+# User fields shown on the post cards of the author.
+AUTHOR_CARD_FIELDS = ('username', 'first_name', 'last_name')
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    group_id = instance.group_id
+    if created:
+        feeds.touch_groups(group_id, delta=1)
+        forget_cards(instance.author_id)
+        message = {'post': instance.pk, 'author': instance.author_id}
+        transaction.on_commit(
+            lambda: publish(events.POSTS_CHANNEL, message)
+        )
+    elif not hasattr(instance, '_loaded_group_id'):
+        feeds.recount_groups(group_id)
+    elif instance._loaded_group_id != group_id:
+        feeds.touch_groups(instance._loaded_group_id, delta=-1)
+        feeds.touch_groups(group_id, delta=1)
+    else:
+        feeds.touch_groups(group_id)
+    instance._loaded_group_id = group_id
+    image = instance.image.name or None
+    if created or hasattr(instance, '_loaded_image'):
+        loaded_image = getattr(instance, '_loaded_image', None) or None
+        if image != loaded_image:
+            media.acquire(image)
+            media.release(loaded_image)
+    instance._loaded_image = image
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=ArchivedPost)
+def post_image_released(sender, instance, **kwargs):
+    media.release(instance.image.name)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    if instance.deleted_at is not None:
+        # Purged: the feeds and cards stopped counting it when it was
+        # marked as deleted.
+        return
+    feeds.touch_groups(instance.group_id, delta=-1)
+    forget_cards(instance.author_id)
+
+
+@receiver(soft_deleted, sender=Post)
+def posts_soft_deleted(sender, pks, **kwargs):
+    rows = set(
+        Post.all_objects.filter(pk__in=pks)
+        .values_list('group_id', 'author_id').distinct()
+    )
+    feeds.recount_groups(*{group_id for group_id, _ in rows})
+    forget_cards(*{author_id for _, author_id in rows})
+    schedule_purge()
+
+
+@receiver(soft_deleted, sender=Comment)
+def comments_soft_deleted(sender, pks, **kwargs):
+    schedule_purge()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    feeds.invalidate_groups()
+
+
+@receiver(pre_save, sender=Group)
+def group_saving(sender, instance, **kwargs):
+    if instance.pk is None:
+        return
+    stored = Group.objects.filter(pk=instance.pk).values_list(
+        'slug', flat=True
+    ).first()
+    if stored is not None and stored != instance.slug:
+        # Cards link to the group by its slug.
+        refresh_cards(group_id=instance.pk)
+
+
+@receiver(pre_delete, sender=Group)
+def group_deleting(sender, instance, **kwargs):
+    refresh_cards(group_id=instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if not created:
+        return
+    message = {
+        'author': instance.author.username,
+        'text': instance.text,
+    }
+    transaction.on_commit(
+        lambda: publish(events.post_channel(instance.post_id), message)
+    )
+
+
+@receiver(pre_save, sender=User)
+def author_saving(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(
+        AUTHOR_CARD_FIELDS
+    ):
+        return
+    stored = User.objects.filter(pk=instance.pk).values_list(
+        *AUTHOR_CARD_FIELDS
+    ).first()
+    current = tuple(getattr(instance, field) for field in AUTHOR_CARD_FIELDS)
+    if stored is not None and stored != current:
+        refresh_cards(author_id=instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def follow_changed(sender, instance, **kwargs):
+    forget_cards(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=ArchivedPost)
+@receiver(soft_deleted, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(soft_deleted, sender=Comment)
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=User)
+def page_content_changed(sender, **kwargs):
+    pagecache.invalidate()
+
+
+@receiver(post_save, sender=User)
+def user_page_content_changed(sender, update_fields=None, **kwargs):
+    # Every sign-in saves last_login, which no page shows.
+    if update_fields == frozenset({'last_login'}):
+        return
+    pagecache.invalidate()
@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.cache import cache
+from sorl.thumbnail import get_thumbnail
+
+from core.tasks import task
+
+from .models import Post
+
+PURGE_SCHEDULED_KEY = 'posts:purge_scheduled'
+
+
+@task(priority=-1)
+def make_post_thumbnails(post_id):
+    """Render image thumbnails before the post is first shown in a feed."""
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    for geometry, options in settings.POST_IMAGE_THUMBNAILS:
+        get_thumbnail(post.image, geometry, **options)
+
+
+@task(max_retries=0)
+def moderate(operation, kwargs):
+    """Run a large admin moderation operation outside the request."""
+    from .moderation import OPERATIONS
+
+    OPERATIONS[operation](**kwargs)
+
+
+@task(max_retries=3)
+def purge_deleted(**filters):
+    """Remove deleted posts and comments in chunks, with their cascade."""
+    from .moderation import purge_deleted
+
+    if not filters:
+        # Deletes from now on need a purge of their own.
+        cache.delete(PURGE_SCHEDULED_KEY)
+    purge_deleted(**filters)
+
+
+def schedule_purge():
+    """
+    Queue a purge of all the deleted rows unless one is already queued:
+    the deletes of PURGE_DELAY seconds share one job.
+    """
+    if cache.add(PURGE_SCHEDULED_KEY, True, settings.PURGE_DELAY):
+        purge_deleted.enqueue(countdown=settings.PURGE_DELAY)
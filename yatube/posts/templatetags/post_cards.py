@@ -0,0 +1,61 @@
+from django import template
+from django.conf import settings
+from django.utils.safestring import mark_safe
+
+from core.thumbnails import prefetch_thumbnails
+from users.cards import get_card
+
+from ..cards import get_cached_cards, render_card
+
+register = template.Library()
+
+# The first images of a page are on the first screen: they are not
+# loaded lazily, whichever card shows them.
+EAGER_IMAGES = 1
+LAZY = ' loading="lazy"'
+
+
+@register.simple_tag
+def post_image_rendition():
+    """
+    Geometry and options of the thumbnail shown for post images, for
+    ``{% thumbnail image rendition.0 options=rendition.1 %}``.
+    """
+    return settings.POST_IMAGE_THUMBNAILS[0]
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post):
+    """
+    Render the feed card of a post.
+
+    Used instead of {% include %} in the feed loops: the first call loads
+    the cached cards of the whole ``page_obj`` with one cache request and
+    only the missing ones are rendered, with their thumbnails looked up
+    at once. Authors come from ``user_cards``. The cards are cached with
+    lazily loaded images and the first EAGER_IMAGES of the page lose it.
+    """
+    cached = context.render_context.get('post_cards')
+    if cached is None:
+        posts = context.get('page_obj') or [post]
+        cached = get_cached_cards(posts)
+        context.render_context['post_cards'] = cached
+        prefetch_thumbnails(
+            (item.image for item in posts if item.pk not in cached),
+            settings.POST_IMAGE_THUMBNAILS
+        )
+    html = cached.get(post.pk)
+    if html is None:
+        user_cards = context.get('user_cards')
+
+        def get_author():
+            if user_cards is not None and post.author_id in user_cards:
+                return user_cards[post.author_id]
+            return get_card(post.author_id)
+
+        html = render_card(post, get_author)
+    eager = context.render_context.get('post_cards_eager', 0)
+    if eager < EAGER_IMAGES and LAZY in html:
+        html = html.replace(LAZY, '', 1)
+        context.render_context['post_cards_eager'] = eager + 1
+    return mark_safe(html)
@@ -0,0 +1,187 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.paginator import AdminPaginator, EstimatedCountPaginator
+
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class PostAdminTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        Post.objects.bulk_create([
+            Post(text=f'Обычный текст №{i}', author=cls.admin,
+                 group=cls.group)
+            for i in range(5)
+        ])
+        cls.post = Post.objects.create(
+            text='Уникальная пингвинья история', author=cls.admin
+        )
+        Comment.objects.create(
+            post=cls.post, author=cls.admin, text='Пингвины прекрасны'
+        )
+
+    def setUp(self):
+        self.admin_client = Client()
+        self.admin_client.force_login(PostAdminTests.admin)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Список постов в админке не делает запрос на каждую строку."""
+        url = reverse('admin:posts_post_changelist')
+        self.admin_client.get(url)
+        with CaptureQueriesContext(connection) as few_rows:
+            self.admin_client.get(url)
+        other_group = Group.objects.create(title='Другая', slug='other')
+        Post.objects.bulk_create([
+            Post(text=f'Еще текст №{i}', author=PostAdminTests.admin,
+                 group=other_group)
+            for i in range(10)
+        ])
+        with CaptureQueriesContext(connection) as more_rows:
+            response = self.admin_client.get(url)
+        self.assertEqual(len(more_rows), len(few_rows))
+        self.assertContains(response, 'admin-autocomplete')
+        self.assertContains(
+            response, f'<option value="{other_group.pk}" selected>'
+        )
+
+    def test_full_text_search(self):
+        """Поиск в админке идет по полнотекстовому индексу."""
+        for model, expected in (('post', 1), ('comment', 1)):
+            with self.subTest(model=model):
+                response = self.admin_client.get(
+                    reverse(f'admin:posts_{model}_changelist'),
+                    {'q': 'пингвин'}
+                )
+                self.assertEqual(response.context['cl'].result_count, 1)
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=1)
+    def test_estimated_count_paginator(self):
+        """Без фильтров число строк берется из статистики базы."""
+        if connection.vendor != 'sqlite':
+            self.skipTest('sqlite_stat1 is specific to SQLite')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+            cursor.execute(
+                'UPDATE sqlite_stat1 SET stat = %s WHERE tbl = %s',
+                ['1000000 1', 'posts_post']
+            )
+        paginator = EstimatedCountPaginator(Post.objects.all(), 10)
+        self.assertEqual(paginator.count, 1000000)
+        filtered = EstimatedCountPaginator(
+            Post.objects.filter(group=PostAdminTests.group), 10
+        )
+        self.assertEqual(filtered.count, 5)
+        response = self.admin_client.get(
+            reverse('admin:posts_post_changelist')
+        )
+        self.assertContains(response, 'около 1000000')
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=1)
+    def test_admin_counts_filtered_lists_exactly(self):
+        """Админка считает отфильтрованные списки точно и без кэша."""
+        posts = Post.objects.filter(group=PostAdminTests.group)
+        self.assertEqual(AdminPaginator(posts, 10).count, 5)
+        Post.objects.create(
+            text='Новый', author=PostAdminTests.admin,
+            group=PostAdminTests.group
+        )
+        paginator = AdminPaginator(posts, 10)
+        self.assertEqual(paginator.count, 6)
+        self.assertFalse(paginator.count_is_estimate)
+
+
+class ModerationActionsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        cls.spammer = User.objects.create_user(username='spammer')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+
+    def setUp(self):
+        self.admin_client = Client()
+        self.admin_client.force_login(ModerationActionsTests.admin)
+        self.posts = [
+            Post.objects.create(
+                text=f'Спам №{i}', author=ModerationActionsTests.spammer
+            ) for i in range(3)
+        ]
+        self.own_post = Post.objects.create(
+            text='Нормальный пост', author=ModerationActionsTests.admin
+        )
+
+    def _action(self, model, action, objects, **data):
+        return self.admin_client.post(
+            reverse(f'admin:posts_{model}_changelist'),
+            {
+                'action': action,
+                '_selected_action': [obj.pk for obj in objects],
+                **data
+            }
+        )
+
+    @override_settings(MODERATION_CHUNK_SIZE=2)
+    def test_move_to_group(self):
+        """Посты переносятся в группу, счетчик группы обновляется."""
+        response = self._action('post', 'move_to_group', self.posts)
+        self.assertTemplateUsed(response, 'admin/posts/moderation.html')
+        self._action(
+            'post', 'move_to_group', self.posts,
+            apply='1', group=ModerationActionsTests.group.pk
+        )
+        group = Group.objects.get(pk=ModerationActionsTests.group.pk)
+        self.assertEqual(group.posts.count(), 3)
+        self.assertEqual(group.posts_count, 3)
+
+    @override_settings(MODERATION_CHUNK_SIZE=2)
+    def test_delete_by_authors(self):
+        """Удаляются все посты и комментарии автора выбранных записей."""
+        comment = Comment.objects.create(
+            post=self.own_post,
+            author=ModerationActionsTests.spammer,
+            text='Спам'
+        )
+        self._action('comment', 'delete_by_authors', [comment])
+        self._action('post', 'delete_by_authors', self.posts[:1])
+        self.assertFalse(
+            Comment.objects.filter(
+                author=ModerationActionsTests.spammer
+            ).exists()
+        )
+        self.assertEqual(
+            list(Post.objects.all()), [self.own_post]
+        )
+
+    @override_settings(
+        MODERATION_BACKGROUND_THRESHOLD=0, TASKS_BACKEND='eager'
+    )
+    def test_purge_period_in_background(self):
+        """Удаление за период большой выборки идет через очередь задач."""
+        start, end = self.posts[0].pub_date, self.posts[-1].pub_date
+        self._action(
+            'post', 'purge_period', self.posts[:1],
+            apply='1', start=start.strftime('%Y-%m-%d %H:%M:%S.%f'),
+            end=end.strftime('%Y-%m-%d %H:%M:%S.%f')
+        )
+        self.assertEqual(list(Post.objects.all()), [self.own_post])
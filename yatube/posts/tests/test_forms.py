@@ -1,3 +1,4 @@
+import hashlib
 import shutil
 import tempfile
 
@@ -7,6 +8,7 @@ from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
+from core.models import MediaFile
 from posts.models import Comment, Group, Post
 
 User = get_user_model()
@@ -75,7 +77,7 @@ class PostCreateFormTests(TestCase):
         )
         self.assertEqual(Post.objects.count(), posts_count + 1)
         created_post = Post.objects.first()
-        name = form_data['image'].name
+        name = hashlib.sha256(self.small_gif).hexdigest() + '.gif'
         self.assertEqual(created_post.text, form_data['text'])
         self.assertEqual(created_post.author, form_data['author'])
         self.assertEqual(created_post.group.id, form_data['group'])
@@ -108,6 +110,21 @@ class PostCreateFormTests(TestCase):
         )
         self.assertEqual(Post.objects.count(), posts_count)
 
+    def test_same_image_is_stored_once(self):
+        """Одинаковые изображения хранятся одним файлом со счетчиком."""
+        for number in range(2):
+            self.auth_client.post(reverse('posts:post_create'), data={
+                'text': f'Пост с картинкой №{number}',
+                'image': SimpleUploadedFile(
+                    f'copy_{number}.gif', self.small_gif, 'image/gif'
+                ),
+            })
+        names = set(
+            Post.objects.exclude(image='').values_list('image', flat=True)
+        )
+        self.assertEqual(len(names), 1)
+        self.assertEqual(MediaFile.objects.get(name=names.pop()).refs, 2)
+
     def test_unauth_user_can_not_create_post(self):
         """Неавторизованный пользователь не может создать запись в Post."""
         posts_count = Post.objects.count()
@@ -173,6 +190,22 @@ class CommentFormTests(TestCase):
             }
         ))
 
+    def test_repeated_submit_creates_one_comment(self):
+        """Повторная отправка формы с тем же ключом не создает дубликат."""
+        comments_count = Comment.objects.count()
+        url = reverse('posts:add_comment', args=(CommentFormTests.post.id,))
+        form_data = {'text': 'Двойной клик', 'idempotency_key': 'key-1'}
+        for _ in range(2):
+            response = self.auth_client.post(url, data=form_data)
+            self.assertRedirects(response, reverse(
+                'posts:post_detail', args=(CommentFormTests.post.id,)
+            ))
+        self.assertEqual(Comment.objects.count(), comments_count + 1)
+        self.auth_client.post(
+            url, data={'text': 'Другой'}, HTTP_IDEMPOTENCY_KEY='key-2'
+        )
+        self.assertEqual(Comment.objects.count(), comments_count + 2)
+
     def unauth_user_can_not_create_comment(self):
         """Неавторизованный пользователь не может создать запись в Comment."""
         comments_count = Comment.objects.count()
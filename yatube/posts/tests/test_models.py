@@ -1,7 +1,11 @@
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
-from ..models import Group, Post
+from core.models import Job
+from core.signals import soft_deleted
+
+from ..models import Comment, Group, Post
 
 User = get_user_model()
 
@@ -55,3 +59,63 @@ class PostModelTest(TestCase):
         post = PostModelTest.post
         help_text = post._meta.get_field('text').help_text
         self.assertEqual(help_text, 'Введите текст поста')
+
+
+class SoftDeleteTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='Группа', slug='test-slug')
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Тестовый текст', author=SoftDeleteTests.user,
+            group=SoftDeleteTests.group
+        )
+        self.comment = Comment.objects.create(
+            text='Комментарий', author=SoftDeleteTests.user, post=self.post
+        )
+
+    def test_deleted_post_is_hidden_until_purged(self):
+        """Удаленный пост скрыт сразу, а из базы удаляется в фоне."""
+        self.post.delete()
+        self.assertFalse(Post.objects.filter(pk=self.post.pk).exists())
+        self.assertTrue(Post.all_objects.filter(pk=self.post.pk).exists())
+        group = Group.objects.get(pk=SoftDeleteTests.group.pk)
+        self.assertEqual(group.posts_count, 0)
+        self.assertEqual(Comment.objects.count(), 1)
+
+    def test_deletes_share_one_purge_job(self):
+        """Удаления ставят в очередь одну задачу очистки."""
+        other = Post.objects.create(
+            text='Другой пост', author=SoftDeleteTests.user
+        )
+        received = []
+
+        def receiver(sender, pks, **kwargs):
+            received.append(pks)
+
+        soft_deleted.connect(receiver, sender=Post)
+        self.addCleanup(soft_deleted.disconnect, receiver, sender=Post)
+        self.post.delete()
+        Post.objects.filter(pk=other.pk).delete()
+        self.comment.delete()
+        self.assertEqual(received, [[self.post.pk], [other.pk]])
+        self.assertEqual(
+            Job.objects.filter(name='posts.tasks.purge_deleted').count(), 1
+        )
+
+    @override_settings(TASKS_BACKEND='eager')
+    def test_purge_removes_rows_and_keeps_counters(self):
+        """Фоновая очистка удаляет пост с комментариями без двойного учета."""
+        Post.objects.create(
+            text='Другой пост', author=SoftDeleteTests.user,
+            group=SoftDeleteTests.group
+        )
+        Post.objects.filter(pk=self.post.pk).delete()
+        self.assertFalse(Post.all_objects.filter(pk=self.post.pk).exists())
+        self.assertFalse(Comment.all_objects.exists())
+        group = Group.objects.get(pk=SoftDeleteTests.group.pk)
+        self.assertEqual(group.posts_count, 1)
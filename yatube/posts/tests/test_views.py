@@ -1,15 +1,33 @@
+import asyncio
+import os
 import shutil
 import tempfile
+from datetime import timedelta
+from io import StringIO
 
 from django import forms
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.core.paginator import Page
-from django.test import Client, TestCase, override_settings
+from django.core.management import call_command
+from django.core.paginator import Page, Paginator
+from django.template import Context
+from django.test import (Client, TestCase, TransactionTestCase,
+                         override_settings)
 from django.urls import reverse
+from sorl.thumbnail import default, get_thumbnail
 
-from ..models import Follow, Group, Post
+from core.paginator import UncountedPaginator, page_window
+from core.pubsub import get_pubsub, publish
+
+from ..archive import archive_cutoff, archive_posts
+from ..cards import card_key, render_card
+from ..events import POSTS_CHANNEL, post_channel
+from ..models import Comment, Follow, Group, Post
+from ..templatetags.post_cards import post_card
 
 User = get_user_model()
 
@@ -66,6 +84,8 @@ class PostPagesTests(TestCase):
         shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
 
     def setUp(self):
+        # Pages cached by the previous test would come without context.
+        cache.clear()
         self.author = PostPagesTests.user
         self.author_client = Client()
         self.author_client.force_login(self.author)
@@ -189,6 +209,25 @@ class PostPagesTests(TestCase):
                     PostPagesTests.post, response.context.get('page_obj')
                 )
 
+    def test_post_images_reserve_space(self):
+        """Картинки выводятся с размерами, превью и ленивой загрузкой."""
+        post = PostPagesTests.post
+        self.assertTrue(
+            post.image_placeholder.startswith('data:image/jpeg;base64,')
+        )
+        Post.objects.create(
+            text='Новый пост', author=self.author,
+            image=SimpleUploadedFile('new.gif', PostPagesTests.small_gif)
+        )
+        response = self.author_client.get(reverse('posts:index'))
+        self.assertContains(response, 'width="960" height="339"', count=2)
+        self.assertContains(response, post.image_placeholder, count=2)
+        # The first image is on the first screen and loads at once.
+        self.assertContains(response, 'loading="lazy"', count=1)
+        Post.objects.create(text='Пост без картинки', author=self.author)
+        response = self.author_client.get(reverse('posts:index'))
+        self.assertContains(response, 'loading="lazy"', count=1)
+
     def test_post_not_in_a_wrong_group(self):
         """Созданный пост не попал не в свою группу"""
         response = self.author_client.get(
@@ -250,6 +289,52 @@ class PaginatorViewsTest(TestCase):
                         len(response.context['page_obj'].object_list), length
                     )
 
+    def test_index_is_paginated_without_count(self):
+        """Главная лента не считает посты и ссылается на следующую"""
+        response = self.author_client.get(reverse('posts:index'))
+        page_obj = response.context['page_obj']
+        self.assertIsNone(page_obj.paginator.count)
+        self.assertTrue(page_obj.has_next())
+        self.assertContains(response, '?page=2')
+        response = self.author_client.get(reverse('posts:index'), {'page': 9})
+        self.assertEqual(response.context['page_obj'].number, 1)
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=5)
+    def test_large_profile_count_is_approximate(self):
+        """Большое число постов профиля считается раз в период"""
+        cache.clear()
+        url = reverse('posts:profile', args=(PaginatorViewsTest.user,))
+        response = self.author_client.get(url)
+        self.assertEqual(response.context['posts_number'], self.all_posts)
+        self.assertTrue(response.context['posts_number_is_estimate'])
+        self.assertContains(response, f'около {self.all_posts}')
+        Post.objects.create(text='Новый', author=PaginatorViewsTest.user)
+        response = self.author_client.get(url, {'page': 2})
+        self.assertEqual(response.context['posts_number'], self.all_posts)
+        self.assertEqual(len(response.context['page_obj']), 4)
+
+    def test_page_window(self):
+        """Навигация ссылается на края и соседей текущей страницы"""
+        paginator = Paginator(range(1000), 10)
+        self.assertEqual(
+            page_window(paginator.page(50)),
+            [1, None, 48, 49, 50, 51, 52, None, 100]
+        )
+        self.assertEqual(
+            page_window(paginator.page(2)),
+            [1, 2, 3, 4, None, 100]
+        )
+        self.assertEqual(
+            page_window(Paginator(range(50), 10).page(3)), [1, 2, 3, 4, 5]
+        )
+        uncounted = UncountedPaginator(range(1000), 10)
+        self.assertEqual(
+            page_window(uncounted.page(50)), [1, None, 48, 49, 50, 51]
+        )
+        self.assertEqual(page_window(uncounted.page(100)), [
+            1, None, 98, 99, 100
+        ])
+
 
 class FollowTests(TestCase):
     @classmethod
@@ -353,3 +438,437 @@ class FollowTests(TestCase):
         self.assertNotIn(
             new_post, response.context.get('page_obj')
         )
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=0)
+class GroupFeedCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовый заголовок',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        cls.group_2 = Group.objects.create(
+            title='Тестовый заголовок №2',
+            slug='test-slug_2',
+            description='Тестовое описание №2'
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.post = Post.objects.create(
+            text='Тестовый текст',
+            author=GroupFeedCacheTests.user,
+            group=GroupFeedCacheTests.group
+        )
+
+    def _page(self, group):
+        response = self.guest_client.get(
+            reverse('posts:group_list', args=(group.slug,))
+        )
+        return response.context['page_obj']
+
+    def test_group_page_served_from_cache(self):
+        """Повторный запрос группы не считает посты и не ищет группу."""
+        self._page(GroupFeedCacheTests.group)
+        with self.assertNumQueries(2):
+            page_obj = self._page(GroupFeedCacheTests.group)
+        self.assertEqual(page_obj.paginator.count, 1)
+        self.assertIn(self.post, page_obj)
+
+    def test_moved_post_invalidates_both_groups(self):
+        """Перенос поста в другую группу обновляет обе ленты."""
+        self._page(GroupFeedCacheTests.group)
+        self._page(GroupFeedCacheTests.group_2)
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = GroupFeedCacheTests.group_2
+        post.save()
+        old_page = self._page(GroupFeedCacheTests.group)
+        new_page = self._page(GroupFeedCacheTests.group_2)
+        self.assertNotIn(post, old_page)
+        self.assertEqual(old_page.paginator.count, 0)
+        self.assertIn(post, new_page)
+        self.assertEqual(new_page.paginator.count, 1)
+
+    def test_queryset_update_invalidates_groups(self):
+        """Массовое изменение группы сбрасывает кэш лент."""
+        self._page(GroupFeedCacheTests.group)
+        Post.objects.filter(pk=self.post.pk).update(
+            group=GroupFeedCacheTests.group_2
+        )
+        self.assertNotIn(self.post, self._page(GroupFeedCacheTests.group))
+        self.assertIn(self.post, self._page(GroupFeedCacheTests.group_2))
+
+
+class PostCardCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.post = Post.objects.create(
+            text='Тестовый текст',
+            author=PostCardCacheTests.user,
+        )
+
+    def _profile(self):
+        return self.guest_client.get(
+            reverse('posts:profile', args=(PostCardCacheTests.user.username,))
+        ).content.decode()
+
+    def test_card_rendered_once_per_version(self):
+        """Карточка поста кэшируется и обновляется после правки поста."""
+        self.assertIsNone(cache.get(card_key(self.post)))
+        self.assertIn('Тестовый текст', self._profile())
+        self.assertIsNotNone(cache.get(card_key(self.post)))
+        self.post.text = 'Новый текст'
+        self.post.save()
+        content = self._profile()
+        self.assertIn('Новый текст', content)
+        self.assertNotIn('Тестовый текст', content)
+
+    def test_card_follows_author_name_and_group_slug(self):
+        """Карточки обновляются при смене имени автора и адреса группы."""
+        group = Group.objects.create(title='Группа', slug='old-slug')
+        self.post.group = group
+        self.post.save()
+        self._profile()
+        user = PostCardCacheTests.user
+        user.first_name = 'Новое'
+        user.last_name = 'Имя'
+        user.save()
+        group.slug = 'new-slug'
+        group.save()
+        content = self._profile()
+        self.assertIn('Новое Имя', content)
+        self.assertIn(
+            reverse('posts:group_list', args=('new-slug',)), content
+        )
+
+    def test_card_without_author_card(self):
+        """Карточка без карточки автора загружает ее или обходится без нее."""
+        self.assertEqual(
+            post_card(Context({'user_cards': {}}), self.post).count(
+                reverse('posts:profile', args=('auth',))
+            ), 1
+        )
+        cache.clear()
+        html = render_card(self.post, lambda: None)
+        self.assertIn('Тестовый текст', html)
+        self.assertNotIn('/profile/', html)
+
+
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            text='Тестовый текст', author=PageCacheTests.author
+        )
+        self.reader_client = Client()
+        self.reader_client.force_login(PageCacheTests.reader)
+        self.profile_url = reverse(
+            'posts:profile', args=(PageCacheTests.author.username,)
+        )
+
+    def test_anonymous_page_is_cached(self):
+        """Повторный запрос гостя не обращается к базе."""
+        self.client.get(self.profile_url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.profile_url)
+        self.assertContains(response, 'Тестовый текст')
+        self.assertContains(response, reverse('users:login'))
+        self.assertNotContains(response, 'Подписаться')
+
+    def test_holes_are_rendered_per_user(self):
+        """Пользователь получает общую страницу со своими частями."""
+        self.client.get(self.profile_url)
+        response = self.reader_client.get(self.profile_url)
+        self.assertContains(response, 'Пользователь: reader')
+        self.assertContains(
+            response,
+            reverse('posts:profile_follow', args=('author',))
+        )
+        self.assertNotContains(response, reverse('users:login'))
+        post_url = reverse('posts:post_detail', args=(self.post.pk,))
+        self.client.get(post_url)
+        response = self.reader_client.get(post_url)
+        self.assertContains(response, 'csrfmiddlewaretoken')
+        self.assertNotContains(
+            response, reverse('posts:post_edit', args=(self.post.pk,))
+        )
+
+    def test_unused_parameters_share_the_page(self):
+        """Параметры, которые страница не читает, не создают новых записей."""
+        self.client.get(self.profile_url, {'page': 1})
+        with self.assertNumQueries(0):
+            self.client.get(self.profile_url, {'page': 1, 'utm_source': 'x'})
+
+    def test_sign_in_keeps_pages(self):
+        """Вход пользователя не сбрасывает кэш страниц."""
+        self.client.get(self.profile_url)
+        update_last_login(None, PageCacheTests.reader)
+        with self.assertNumQueries(0):
+            self.client.get(self.profile_url)
+
+    def test_writes_invalidate_pages(self):
+        """Новые посты, комментарии и подписки сбрасывают страницы."""
+        self.client.get(self.profile_url)
+        Post.objects.create(text='Второй пост', author=PageCacheTests.author)
+        self.assertContains(self.client.get(self.profile_url), 'Второй пост')
+        Follow.objects.create(
+            user=PageCacheTests.reader, author=PageCacheTests.author
+        )
+        response = self.reader_client.get(self.profile_url)
+        self.assertContains(
+            response,
+            reverse('posts:profile_unfollow', args=('author',))
+        )
+
+
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='Группа', slug='test-slug')
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(ArchiveTests.user)
+        self.old_post = Post.objects.create(
+            text='Старый пост', author=ArchiveTests.user,
+            group=ArchiveTests.group
+        )
+        Comment.objects.create(
+            text='Старый комментарий', author=ArchiveTests.user,
+            post=self.old_post
+        )
+        Post.objects.filter(pk=self.old_post.pk).update(
+            pub_date=archive_cutoff() - timedelta(days=1)
+        )
+        self.new_post = Post.objects.create(
+            text='Новый пост', author=ArchiveTests.user
+        )
+        self.assertEqual(archive_posts(archive_cutoff()), 1)
+
+    def test_archived_post_page(self):
+        """Архивный пост открывается со старыми комментариями, без формы."""
+        self.assertFalse(Post.all_objects.filter(pk=self.old_post.pk))
+        response = self.authorized_client.get(
+            reverse('posts:post_detail', args=(self.old_post.pk,))
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['post_obj'].is_archived)
+        self.assertContains(response, 'Старый комментарий')
+        self.assertNotContains(
+            response, reverse('posts:add_comment', args=(self.old_post.pk,))
+        )
+        self.assertEqual(Group.objects.get(slug='test-slug').posts_count, 0)
+
+    @override_settings(POST_NUMBER=1)
+    def test_profile_continues_with_archive(self):
+        """Профиль показывает архивные посты после свежих."""
+        url = reverse('posts:profile', args=(ArchiveTests.user.username,))
+        first = self.authorized_client.get(url)
+        second = self.authorized_client.get(url, {'page': 2})
+        self.assertEqual(first.context['posts_number'], 2)
+        self.assertEqual(list(first.context['page_obj']), [self.new_post])
+        self.assertEqual(
+            [post.pk for post in second.context['page_obj']],
+            [self.old_post.pk]
+        )
+
+
+@override_settings(SSE_HEARTBEAT=0)
+class EventStreamTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='follower')
+        cls.author = User.objects.create_user(username='author')
+        cls.stranger = User.objects.create_user(username='stranger')
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        self.user_client = Client()
+        self.user_client.force_login(EventStreamTests.user)
+        self.since = get_pubsub().last_id(POSTS_CHANNEL)
+
+    def _frames(self, url, number):
+        response = self.user_client.get(url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = iter(response.streaming_content)
+        return [next(stream).decode() for _ in range(number)]
+
+    def test_feed_stream_counts_new_posts(self):
+        """Поток ленты сообщает число новых постов."""
+        for author in (EventStreamTests.author, EventStreamTests.stranger):
+            publish(POSTS_CHANNEL, {'post': 0, 'author': author.pk})
+        url = reverse('posts:feed_events')
+        frames = self._frames(f'{url}?feed=index&since={self.since}', 2)
+        self.assertIn('"count": 2', frames[1])
+        frames = self._frames(f'{url}?feed=follow&since={self.since}', 2)
+        self.assertIn('"count": 1', frames[1])
+
+    def test_post_stream_sends_comments(self):
+        """Поток поста передает новые комментарии с их id."""
+        post = Post.objects.create(text='Пост', author=EventStreamTests.author)
+        channel = post_channel(post.pk)
+        since = get_pubsub().last_id(channel)
+        message_id = publish(channel, {'author': 'author', 'text': 'Hi'})
+        frames = self._frames(
+            reverse('posts:post_events', args=(post.pk,)) + f'?since={since}',
+            2
+        )
+        self.assertTrue(frames[1].startswith(f'id: {message_id}\n'))
+        self.assertIn('event: comment', frames[1])
+
+    def test_post_stream_of_missing_post(self):
+        """Поток комментариев несуществующего поста отвечает 404."""
+        response = self.user_client.get(
+            reverse('posts:post_events', args=(0,))
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(SSE_HEARTBEAT=0)
+class AsgiEventStreamTests(TransactionTestCase):
+    """The ASGI application reads the database from executor threads."""
+
+    def request(self, path, query=b''):
+        from yatube.asgi import application
+
+        sent = []
+
+        async def run():
+            body_sent = asyncio.Event()
+
+            async def receive():
+                await body_sent.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                sent.append(message)
+                if message['type'] == 'http.response.body':
+                    body_sent.set()
+
+            scope = {
+                'type': 'http', 'path': path, 'query_string': query,
+                'headers': [],
+            }
+            await asyncio.wait_for(application(scope, receive, send), 5)
+
+        asyncio.run(run())
+        return sent
+
+    def test_post_stream(self):
+        """ASGI-приложение отдает поток комментариев поста."""
+        author = User.objects.create_user(username='author')
+        post = Post.objects.create(text='Пост', author=author)
+        start, body = self.request(f'/live/posts/{post.pk}/events/')[:2]
+        self.assertEqual(start['status'], 200)
+        self.assertIn(
+            (b'content-type', b'text/event-stream'), start['headers']
+        )
+        self.assertTrue(body['body'].startswith(b'retry: '))
+
+    def test_refuses_local_pubsub(self):
+        """С локальным pub/sub ASGI-приложение не запускается."""
+        from yatube.asgi import application
+
+        sent = []
+
+        async def receive():
+            return {'type': 'lifespan.startup'}
+
+        async def send(message):
+            sent.append(message)
+
+        with self.assertRaises(ImproperlyConfigured):
+            asyncio.run(application({'type': 'lifespan'}, receive, send))
+        self.assertEqual(sent[0]['type'], 'lifespan.startup.failed')
+
+    def test_unknown_streams(self):
+        """Неизвестный адрес и несуществующий пост отвечают 404."""
+        for path, query in (
+            ('/live/posts/0/events/', b''),
+            ('/live/events/', b'feed=follow'),
+            ('/posts/0/events/', b''),
+            ('/about/', b''),
+        ):
+            with self.subTest(path=path):
+                self.assertEqual(self.request(path, query)[0]['status'], 404)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp(dir=settings.BASE_DIR))
+class RegenerateThumbnailsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(
+            text='С картинкой', author=user, image=SimpleUploadedFile(
+                'small.gif',
+                b'GIF89a\x02\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff'
+                b'\xff\xff!\xf9\x04\x00\x00\x00\x00\x00,\x00\x00\x00'
+                b'\x00\x02\x00\x01\x00\x00\x02\x02\x0c\n\x00;'
+            )
+        )
+        cls.broken = Post.objects.create(
+            text='Сломанная картинка', author=user,
+            image=SimpleUploadedFile('broken.gif', b'GIF89a')
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+
+    def regenerate(self, *args):
+        out, err = StringIO(), StringIO()
+        call_command(
+            'regenerate_thumbnails', '--workers', '1', *args,
+            stdout=out, stderr=err
+        )
+        return out.getvalue(), err.getvalue()
+
+    def test_thumbnails_are_rendered_once(self):
+        """Команда создает миниатюры, пропускает готовые и считает ошибки."""
+        out, err = self.regenerate()
+        self.assertIn('Обработано: 2, с ошибкой: 1', out)
+        self.assertIn(self.broken.image.name, err)
+        geometry, options = settings.POST_IMAGE_THUMBNAILS[0]
+        thumbnail = get_thumbnail(self.post.image, geometry, **options)
+        self.assertIsNotNone(default.kvstore.get(thumbnail))
+        modified = os.path.getmtime(thumbnail.storage.path(thumbnail.name))
+        self.regenerate()
+        self.assertEqual(
+            os.path.getmtime(thumbnail.storage.path(thumbnail.name)), modified
+        )
+
+    def test_previews_of_old_posts_are_filled(self):
+        """Команда заполняет превью постов, загруженных раньше."""
+        Post.objects.filter(pk=self.post.pk).update(image_placeholder='')
+        self.regenerate()
+        post = Post.objects.get(pk=self.post.pk)
+        self.assertTrue(post.image_placeholder)
+
+    def test_resume_after_image(self):
+        """Обработку можно продолжить после указанного изображения."""
+        first = min(self.post.image.name, self.broken.image.name)
+        out, _ = self.regenerate('--after', first)
+        self.assertIn('Изображений: 1', out)
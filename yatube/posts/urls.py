@@ -16,6 +16,12 @@ urlpatterns = [
         name='add_comment'
     ),
     path('follow/', views.follow_index, name='follow_index'),
+    path('live/events/', views.feed_events, name='feed_events'),
+    path(
+        'live/posts/<int:post_id>/events/',
+        views.post_events,
+        name='post_events'
+    ),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
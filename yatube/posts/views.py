@@ -1,73 +1,117 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.functional import SimpleLazyObject
 
+from core.idempotency import idempotent
+from core.pagecache import cached_page
+from core.paginator import EstimatedCountPaginator, UncountedPaginator
+from core.pubsub import get_pubsub
+from core.ratelimit import ratelimit
+from users.cards import get_cards
+
+from notifications.tasks import notify_followers, notify_post_author
+
+from . import events
+from .archive import ProfileFeed, get_post_or_404
+from .feeds import GroupFeed, get_group_or_404
 from .forms import CommentForm, PostForm
-from .models import Follow, Group, Post
+from .models import Follow, Post
+from .tasks import make_post_thumbnails
 
 User = get_user_model()
 
 
-def paginator(request, posts):
-    paginator = Paginator(posts, settings.POST_NUMBER)
+def paginator(request, posts, count=True):
+    """
+    The requested page. Large totals are approximate; feeds too large to
+    count at all pass ``count=False`` and get no total.
+    """
+    paginator_class = (
+        EstimatedCountPaginator if count else UncountedPaginator
+    )
+    paginator = paginator_class(posts, settings.POST_NUMBER)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return page_obj
 
 
+def author_cards(page_obj):
+    # Lazy, so a page served from the fragment cache loads nothing.
+    return SimpleLazyObject(
+        lambda: get_cards(post.author_id for post in page_obj)
+    )
+
+
+@cached_page
 def index(request):
-    post_list = Post.objects.all()
+    post_list = Post.objects.select_related('group')
+    page_obj = paginator(request, post_list, count=settings.COUNT_LARGE_FEEDS)
     context = {
-        'page_obj': paginator(request, post_list)
+        'page_obj': page_obj,
+        'user_cards': author_cards(page_obj),
+        'events_since': get_pubsub().last_id(events.POSTS_CHANNEL),
     }
     template = 'posts/index.html'
     return render(request, template, context)
 
 
+@cached_page
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
+    group = get_group_or_404(slug)
+    page_obj = paginator(request, GroupFeed(group))
     context = {
         'group': group,
-        'page_obj': paginator(request, posts),
+        'page_obj': page_obj,
+        'user_cards': author_cards(page_obj),
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@cached_page
 def profile(request, username):
-    user_obj = get_object_or_404(User, username=username)
-    user_posts = user_obj.posts.all()
-    posts_number = user_posts.count()
-    current_user = request.user
-    if current_user.is_authenticated:
-        following = user_obj.following.filter(user=current_user.id).exists()
+    user_obj = get_object_or_404(User, username=username, is_active=True)
+    user_posts = ProfileFeed(user_obj)
+    if request.user.is_authenticated:
+        following = user_obj.following.filter(user=request.user).exists()
     else:
         following = None
+    page_obj = paginator(request, user_posts)
     context = {
-        'page_obj': paginator(request, user_posts),
+        'page_obj': page_obj,
+        'user_cards': author_cards(page_obj),
         'user_obj': user_obj,
-        'posts_number': posts_number,
+        'posts_number': page_obj.paginator.count,
+        'posts_number_is_estimate': page_obj.paginator.count_is_estimate,
         'following': following,
-        'current_user': current_user
     }
     return render(request, 'posts/profile.html', context)
 
 
+@cached_page
 def post_detail(request, post_id):
-    post_obj = get_object_or_404(Post, pk=post_id)
-    comments = post_obj.comments.all()
+    post_obj = get_post_or_404(post_id)
+    # Archived comments of deleted accounts stay until they are purged.
+    comments = list(post_obj.comments.filter(author__is_active=True))
     form = CommentForm(request.POST or None,)
     context = {
         'post_obj': post_obj,
         'comments': comments,
+        'user_cards': get_cards(
+            [post_obj.author_id]
+            + [comment.author_id for comment in comments]
+        ),
         'form': form,
+        'events_since': get_pubsub().last_id(events.post_channel(post_id)),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
 @login_required
+@idempotent
+@ratelimit('posts')
 def post_create(request):
     form = PostForm(
         request.POST or None,
@@ -77,6 +121,9 @@ def post_create(request):
         new_post = form.save(commit=False)
         new_post.author = request.user
         new_post.save()
+        if new_post.image:
+            make_post_thumbnails.delay(new_post.pk)
+        notify_followers.delay(new_post.pk)
         return redirect('posts:profile', request.user.username)
     form = PostForm()
     context = {'form': form}
@@ -94,13 +141,17 @@ def post_edit(request, post_id):
         instance=post_obj,
     )
     if form.is_valid():
-        form.save()
+        post_obj = form.save()
+        if 'image' in form.changed_data and post_obj.image:
+            make_post_thumbnails.delay(post_obj.pk)
         return redirect('posts:post_detail', post_id)
     context = {'form': form, 'post_obj': post_obj}
     return render(request, 'posts/post_create.html', context)
 
 
 @login_required
+@idempotent
+@ratelimit('comments')
 def add_comment(request, post_id):
     post_obj = get_object_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
@@ -109,6 +160,7 @@ def add_comment(request, post_id):
         comment.author = request.user
         comment.post = post_obj
         comment.save()
+        notify_post_author.delay(comment.pk)
     return redirect('posts:post_detail', post_id=post_id)
 
 
@@ -116,16 +168,49 @@ def add_comment(request, post_id):
 def follow_index(request):
     post_list = Post.objects.filter(
         author__following__user=request.user
-    )
+    ).select_related('group')
+    page_obj = paginator(request, post_list, count=settings.COUNT_LARGE_FEEDS)
     context = {
-        'page_obj': paginator(request, post_list)
+        'page_obj': page_obj,
+        'user_cards': author_cards(page_obj),
+        'events_since': get_pubsub().last_id(events.POSTS_CHANNEL),
     }
     return render(request, 'posts/follow.html', context)
 
 
+def event_stream(source):
+    response = StreamingHttpResponse(
+        events.iter_events(source), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def feed_events(request):
+    feed = request.GET.get('feed')
+    if feed == 'follow' and not request.user.is_authenticated:
+        return redirect('users:login')
+    since = events.parse_since(request.GET.get('since'))
+    return event_stream(
+        events.feed_source(feed, since, request.user.pk)
+    )
+
+
+def post_events(request, post_id):
+    since = events.parse_since(
+        request.GET.get('since'), request.META.get('HTTP_LAST_EVENT_ID')
+    )
+    source = events.comments_source(post_id, since)
+    if source is None:
+        raise Http404
+    return event_stream(source)
+
+
 @login_required
+@ratelimit('follow')
 def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(User, username=username, is_active=True)
     if request.user != author:
         Follow.objects.get_or_create(
             author=author,
@@ -136,7 +221,7 @@ def profile_follow(request, username):
 
 @login_required
 def profile_unfollow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(User, username=username, is_active=True)
     follow_obj = Follow.objects.filter(
         user=request.user.id, author=author.id
     )
@@ -0,0 +1,32 @@
+// Живые обновления ленты и комментариев через Server-Sent Events.
+(function () {
+  if (!window.EventSource) {
+    return;
+  }
+  var banner = document.querySelector('[data-new-posts]');
+  if (banner) {
+    var feed = new EventSource(banner.dataset.newPosts);
+    feed.addEventListener('posts', function (event) {
+      var count = JSON.parse(event.data).count;
+      banner.querySelector('[data-count]').textContent = count;
+      banner.hidden = false;
+    });
+  }
+  var comments = document.querySelector('[data-new-comments]');
+  if (comments) {
+    var stream = new EventSource(comments.dataset.newComments);
+    stream.addEventListener('comment', function (event) {
+      var comment = JSON.parse(event.data);
+      var item = document.createElement('div');
+      var title = document.createElement('h5');
+      var text = document.createElement('p');
+      item.className = 'media mb-4';
+      title.className = 'mt-0';
+      title.textContent = comment.author;
+      text.textContent = comment.text;
+      item.appendChild(title);
+      item.appendChild(text);
+      comments.insertBefore(item, comments.firstChild);
+    });
+  }
+})();
@@ -0,0 +1,21 @@
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
+
+from .deletion import soft_delete_user
+
+User = get_user_model()
+
+
+class SoftDeleteUserAdmin(UserAdmin):
+    """Deletes accounts through the background purge."""
+    def delete_model(self, request, obj):
+        soft_delete_user(obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            soft_delete_user(user)
+
+
+admin.site.unregister(User)
+admin.site.register(User, SoftDeleteUserAdmin)
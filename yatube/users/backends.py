@@ -0,0 +1,30 @@
+"""
+Authentication backend that keeps signed-in users in the cache.
+
+``AuthenticationMiddleware`` loads the user row on every request. This
+backend serves it from the shared cache instead. The entry is dropped
+whenever the user is saved, which covers password changes and resets, on
+logout and when the account is deactivated.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+def _key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def forget_user(user_id):
+    cache.delete(_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        key = _key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
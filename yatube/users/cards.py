@@ -0,0 +1,79 @@
+"""
+Compact cached "cards" with the user data shown next to posts.
+
+A card is a dict with ``id``, ``username``, ``full_name`` and the
+``posts``, ``followers`` and ``following`` counters. Pages load the cards
+of all their authors with one ``get_many`` and fetch only the missing ones
+from the database.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from posts.models import ArchivedPost, Follow, Post
+
+User = get_user_model()
+
+
+def _key(user_id):
+    return f'user:card:{user_id}'
+
+
+def _count(queryset, field):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{field: OuterRef('pk')}).order_by()
+            .values(field).annotate(number=Count('pk')).values('number'),
+            output_field=IntegerField()
+        ),
+        0
+    )
+
+
+def _load(user_ids):
+    users = User.objects.filter(pk__in=user_ids).annotate(
+        posts_number=(
+            _count(Post.objects.all(), 'author')
+            + _count(ArchivedPost.objects.all(), 'author')
+        ),
+        followers_number=_count(Follow.objects.all(), 'author'),
+        following_number=_count(Follow.objects.all(), 'user'),
+    )
+    return {
+        user.pk: {
+            'id': user.pk,
+            'username': user.username,
+            'full_name': user.get_full_name(),
+            'posts': user.posts_number,
+            'followers': user.followers_number,
+            'following': user.following_number,
+        } for user in users
+    }
+
+
+def get_cards(user_ids):
+    """Return a dict of cards for the given user ids."""
+    user_ids = set(filter(None, user_ids))
+    if not user_ids:
+        return {}
+    found = cache.get_many([_key(user_id) for user_id in user_ids])
+    cards = {card['id']: card for card in found.values()}
+    missing = user_ids - set(cards)
+    if missing:
+        loaded = _load(missing)
+        cache.set_many(
+            {_key(user_id): card for user_id, card in loaded.items()},
+            settings.USER_CARD_TIMEOUT
+        )
+        cards.update(loaded)
+    return cards
+
+
+def get_card(user_id):
+    return get_cards([user_id]).get(user_id)
+
+
+def forget_cards(*user_ids):
+    cache.delete_many([_key(user_id) for user_id in user_ids if user_id])
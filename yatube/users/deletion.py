@@ -0,0 +1,39 @@
+"""
+Account deletion in two steps.
+
+Deleting a user with many posts through the ORM cascades over every post,
+comment, follow and notification in one transaction. ``soft_delete_user``
+instead deactivates the account and hides its posts and comments with two
+UPDATEs; the archived ones are hidden by the inactive author. ``purge_user``
+later removes them all in chunks and finally deletes the user row, whose
+own cascade is small by then.
+"""
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+
+from posts.archive import purge_archived
+from posts.models import Comment, Follow, Post
+from posts.moderation import purge_deleted
+
+from . import tasks
+from .backends import forget_user
+
+User = get_user_model()
+
+
+def soft_delete_user(user):
+    with transaction.atomic():
+        User.objects.filter(pk=user.pk).update(is_active=False)
+        user.is_active = False
+        forget_user(user.pk)
+        Post.objects.filter(author=user).delete()
+        Comment.objects.filter(author=user).delete()
+        Follow.objects.filter(Q(user=user) | Q(author=user)).delete()
+    tasks.purge_user.delay(user.pk)
+
+
+def purge_user(user_id):
+    purge_deleted(author_id=user_id)
+    purge_archived(author_id=user_id)
+    User.objects.filter(pk=user_id, is_active=False).delete()
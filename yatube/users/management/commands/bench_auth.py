@@ -0,0 +1,70 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.bench import rolled_back
+
+User = get_user_model()
+
+MODES = (
+    (
+        'сессии и пользователь из базы',
+        'django.contrib.sessions.backends.db',
+        'django.contrib.auth.backends.ModelBackend',
+    ),
+    (
+        'сессии и пользователь из кэша',
+        'django.contrib.sessions.backends.cached_db',
+        'users.backends.CachedModelBackend',
+    ),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет накладные расходы запроса авторизованного пользователя '
+        'с сессиями и пользователем из базы и из кэша.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--repeat', type=int, default=200,
+            help='Число запросов в каждом режиме.'
+        )
+
+    def handle(self, *args, **options):
+        with rolled_back(), override_settings(DEBUG=False):
+            self._run(options['repeat'])
+
+    def _measure(self, title, client, repeat):
+        url = reverse('about:author')
+        client.get(url)
+        timings = []
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(repeat):
+                started = time.perf_counter()
+                client.get(url)
+                timings.append(time.perf_counter() - started)
+        self.stdout.write(
+            f'  {title}: {statistics.median(timings) * 1000:.2f} мс, '
+            f'запросов к базе: {len(queries) / repeat:g}'
+        )
+
+    def _run(self, repeat):
+        user = User.objects.create_user(username='bench_reader')
+        self._measure('гость', Client(), repeat)
+        for title, engine, backend in MODES:
+            with override_settings(
+                SESSION_ENGINE=engine, AUTHENTICATION_BACKENDS=[backend]
+            ):
+                cache.clear()
+                client = Client()
+                client.force_login(user, backend=backend)
+                self._measure(title, client, repeat)
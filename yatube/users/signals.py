@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import forget_user
+from .cards import forget_cards
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    forget_user(instance.pk)
+    if update_fields == frozenset({'last_login'}):
+        return
+    forget_cards(instance.pk)
+
+
+@receiver(user_logged_out)
+def user_signed_out(sender, user, **kwargs):
+    if user is not None:
+        forget_user(user.pk)
@@ -0,0 +1,19 @@
+from django.core.mail import EmailMultiAlternatives
+
+from core.tasks import task
+
+
+@task(priority=10, max_retries=5)
+def send_email(subject, body, from_email, to, html_body=None):
+    message = EmailMultiAlternatives(subject, body, from_email, to)
+    if html_body is not None:
+        message.attach_alternative(html_body, 'text/html')
+    message.send()
+
+
+@task(max_retries=3)
+def purge_user(user_id):
+    """Remove a deleted account with its content, see users/deletion.py."""
+    from .deletion import purge_user
+
+    purge_user(user_id)
@@ -0,0 +1,17 @@
+from django import template
+
+from ..cards import get_card
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def user_card(context, user_id):
+    """
+    Card of the user from the ``user_cards`` loaded by the view, or from
+    the cache when the view did not load it.
+    """
+    cards = context.get('user_cards')
+    if cards is not None and user_id in cards:
+        return cards[user_id]
+    return get_card(user_id)
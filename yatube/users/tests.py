@@ -0,0 +1,165 @@
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.archive import archive_cutoff, archive_posts
+from posts.models import ArchivedComment, ArchivedPost, Comment, Follow, Post
+
+from .cards import get_card, get_cards
+from .deletion import soft_delete_user
+
+User = get_user_model()
+
+
+class UserCardTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.users = [
+            User.objects.create_user(
+                username=f'user_{i}', first_name='Имя', last_name=f'№{i}'
+            ) for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cards_are_loaded_in_one_query(self):
+        """Карточки страницы загружаются одним запросом и кэшируются."""
+        ids = [user.pk for user in UserCardTests.users]
+        with self.assertNumQueries(1):
+            cards = get_cards(ids)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_cards(ids), cards)
+        self.assertEqual(cards[ids[0]]['full_name'], 'Имя №0')
+        self.assertEqual(cards[ids[0]]['username'], 'user_0')
+
+    def test_cards_are_invalidated(self):
+        """Карточка обновляется при изменении профиля, постов и подписок."""
+        author, follower = UserCardTests.users[:2]
+        get_cards([author.pk, follower.pk])
+        author.first_name = 'Новое'
+        author.save()
+        Post.objects.create(text='Пост', author=author)
+        Follow.objects.create(user=follower, author=author)
+        card = get_card(author.pk)
+        self.assertEqual(card['full_name'], 'Новое №0')
+        self.assertEqual(card['posts'], 1)
+        self.assertEqual(card['followers'], 1)
+        self.assertEqual(get_card(follower.pk)['following'], 1)
+
+
+class UserDeletionTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        self.post = Post.objects.create(text='Пост', author=self.author)
+        Comment.objects.create(
+            text='Комментарий', author=self.reader, post=self.post
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+
+    def test_deleted_user_is_hidden(self):
+        """Удаленный пользователь и его посты скрыты до очистки."""
+        soft_delete_user(self.author)
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(Follow.objects.exists())
+        self.assertTrue(User.objects.filter(pk=self.author.pk).exists())
+        response = self.client.get(
+            reverse('posts:profile', args=(self.author.username,))
+        )
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(TASKS_BACKEND='eager')
+    def test_deleted_user_is_purged(self):
+        """Фоновая очистка удаляет пользователя и его контент."""
+        soft_delete_user(self.author)
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+        self.assertFalse(Post.all_objects.exists())
+        self.assertFalse(Comment.all_objects.exists())
+
+    @override_settings(TASKS_BACKEND='eager')
+    def test_archived_content_is_purged(self):
+        """Очистка удаляет и архивные посты и комментарии пользователя."""
+        post = Post.objects.create(text='Чужой пост', author=self.reader)
+        Comment.objects.create(text='Ответ', author=self.author, post=post)
+        archive_posts(archive_cutoff(-1))
+        soft_delete_user(self.author)
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+        self.assertFalse(ArchivedPost.objects.filter(pk=self.post.pk).exists())
+        self.assertTrue(ArchivedPost.objects.filter(pk=post.pk).exists())
+        self.assertFalse(ArchivedComment.objects.exists())
+
+    def test_archived_content_is_hidden(self):
+        """Архивные посты и комментарии удаленного пользователя скрыты."""
+        post = Post.objects.create(text='Чужой пост', author=self.reader)
+        Comment.objects.create(text='Ответ', author=self.author, post=post)
+        archive_posts(archive_cutoff(-1))
+        soft_delete_user(self.author)
+        response = self.client.get(
+            reverse('posts:post_detail', args=(self.post.pk,))
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(
+            reverse('posts:post_detail', args=(post.pk,))
+        )
+        self.assertNotContains(response, 'Ответ')
+
+
+class CachedAuthTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='reader', password='old-pass-123'
+        )
+        self.client.force_login(self.user)
+        self.url = reverse('about:author')
+
+    def test_old_sessions_stay_signed_in(self):
+        """Сессии, открытые через ModelBackend, остаются действительными."""
+        self.client.force_login(
+            self.user, backend='django.contrib.auth.backends.ModelBackend'
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_session_and_user_are_cached(self):
+        """Сессия и пользователь не читаются из базы на каждом запросе."""
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_password_change_signs_out(self):
+        """Смена пароля завершает сессии, несмотря на кэш."""
+        self.client.get(self.url)
+        self.user.set_password('new-pass-456')
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertFalse(response.context['user'].is_authenticated)
+
+    def test_logout_forgets_user(self):
+        """Выход убирает пользователя из кэша."""
+        self.client.get(self.url)
+        self.assertIsNotNone(cache.get(f'auth:user:{self.user.pk}'))
+        self.client.get(reverse('users:logout'))
+        self.assertIsNone(cache.get(f'auth:user:{self.user.pk}'))
+
+
+@override_settings(TASKS_BACKEND='eager')
+class PasswordResetTests(TestCase):
+    def test_reset_letter_keeps_its_lines(self):
+        """Письмо сброса пароля не теряет переносов строк."""
+        User.objects.create_user(
+            username='reader', email='r@example.com', password='pass-123'
+        )
+        self.client.post(
+            reverse('users:password_reset_form'), {'email': 'r@example.com'}
+        )
+        self.assertEqual(len(mail.outbox), 1)
+        lines = mail.outbox[0].body.splitlines()
+        self.assertIn('', lines)
+        link = next(line for line in lines if '://' in line)
+        self.assertTrue(link.startswith('http://testserver/'))
@@ -0,0 +1,148 @@
+"""
+ASGI entry point for the live update streams.
+
+Django 2.2 serves requests only through WSGI, where every open
+Server-Sent Events connection occupies a worker. This application serves
+just the event stream URLs on an event loop, so idle browsers cost a
+coroutine instead of a thread. The pages open their streams under
+``/live/``: route that prefix to this application, for example with
+``uvicorn yatube.asgi:application``, and everything else to WSGI. The
+WSGI views at the same addresses are only a fallback for ``runserver``.
+
+Posts and comments are published by the WSGI workers, so the pub/sub
+backend must be shared between processes; the application refuses to
+start on a process-local one.
+"""
+import asyncio
+import os
+import re
+from http.cookies import SimpleCookie
+from importlib import import_module
+from types import SimpleNamespace
+from urllib.parse import parse_qs
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user  # noqa: E402
+from django.core.exceptions import ImproperlyConfigured  # noqa: E402
+from django.db import close_old_connections  # noqa: E402
+
+from core.pubsub import check_shared  # noqa: E402
+from posts import events  # noqa: E402
+
+FEED_EVENTS_PATH = '/live/events/'
+POST_EVENTS_PATH = re.compile(r'^/live/posts/(?P<post_id>\d+)/events/$')
+
+
+def _user_id(headers):
+    """Resolve the user from the session cookie, as the WSGI stack would."""
+    cookie = SimpleCookie(headers.get('cookie', ''))
+    morsel = cookie.get(settings.SESSION_COOKIE_NAME)
+    if morsel is None:
+        return None
+    engine = import_module(settings.SESSION_ENGINE)
+    try:
+        user = get_user(
+            SimpleNamespace(session=engine.SessionStore(morsel.value))
+        )
+        return user.pk
+    finally:
+        close_old_connections()
+
+
+def _build_source(path, query, headers):
+    """Return an event source for the path or None when it is unknown."""
+    since = query.get('since', [None])[0]
+    if path == FEED_EVENTS_PATH:
+        feed = query.get('feed', [None])[0]
+        user_id = _user_id(headers) if feed == 'follow' else None
+        if feed == 'follow' and user_id is None:
+            return None
+        try:
+            return events.feed_source(
+                feed, events.parse_since(since), user_id
+            )
+        finally:
+            close_old_connections()
+    match = POST_EVENTS_PATH.match(path)
+    if match:
+        try:
+            return events.comments_source(
+                int(match.group('post_id')),
+                events.parse_since(since, headers.get('last-event-id'))
+            )
+        finally:
+            close_old_connections()
+    return None
+
+
+async def _send_empty(send, status):
+    await send({'type': 'http.response.start', 'status': status,
+                'headers': []})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def _stream(source, send):
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [
+            (b'content-type', b'text/event-stream'),
+            (b'cache-control', b'no-cache'),
+        ],
+    })
+    async for frame in events.aiter_events(source):
+        await send({
+            'type': 'http.response.body',
+            'body': frame.encode(),
+            'more_body': True,
+        })
+
+
+async def _wait_disconnect(receive):
+    while (await receive())['type'] != 'http.disconnect':
+        pass
+
+
+async def _lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                check_shared()
+            except ImproperlyConfigured as error:
+                await send({
+                    'type': 'lifespan.startup.failed', 'message': str(error)
+                })
+                raise
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await _lifespan(receive, send)
+    headers = {
+        name.decode('latin-1'): value.decode('latin-1')
+        for name, value in scope['headers']
+    }
+    query = parse_qs(scope['query_string'].decode())
+    loop = asyncio.get_event_loop()
+    source = await loop.run_in_executor(
+        None, _build_source, scope['path'], query, headers
+    )
+    if source is None:
+        return await _send_empty(send, 404)
+    stream = asyncio.ensure_future(_stream(source, send))
+    disconnect = asyncio.ensure_future(_wait_disconnect(receive))
+    done, pending = await asyncio.wait(
+        (stream, disconnect), return_when=asyncio.FIRST_COMPLETED
+    )
+    for task in pending:
+        task.cancel()
@@ -40,6 +40,7 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'notifications.apps.NotificationsConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -52,6 +53,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.staticfiles.StaticFilesMiddleware',
+    'core.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -63,19 +66,30 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'yatube.urls'
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+# The HTML templates of TEMPLATES_DIR are minified when loaded, see
+# core.loaders.
+TEMPLATE_LOADERS = [
+    'core.loaders.FilesystemLoader',
+    'django.template.loaders.app_directories.Loader',
+]
 
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': (
+                TEMPLATE_LOADERS if DEBUG
+                else [('django.template.loaders.cached.Loader',
+                       TEMPLATE_LOADERS)]
+            ),
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'notifications.context_processors.unread_notifications',
             ],
         },
     },
@@ -113,6 +127,15 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Sessions and signed-in users are read from the cache, see users/backends.py.
+# ModelBackend stays listed for the sessions that were opened with it.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+AUTHENTICATION_BACKENDS = [
+    'users.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+AUTH_USER_CACHE_TIMEOUT = 60 * 15
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/2.2/topics/i18n/
@@ -131,6 +154,13 @@ USE_TZ = True
 STATIC_URL = '/static/'
 
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
+# collectstatic writes hashed and compressed files here, served by
+# core.staticfiles.StaticFilesMiddleware.
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+STATICFILES_STORAGE = 'core.staticfiles.CompressedManifestStaticFilesStorage'
+STATIC_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Smaller responses are sent uncompressed, see core.compression.
+COMPRESS_MIN_SIZE = 1024
 
 
 LOGIN_URL = 'users:login'
@@ -138,14 +168,90 @@ LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 POST_NUMBER = 10
+# The main and follow feeds are paginated without COUNT(*) when False.
+COUNT_LARGE_FEEDS = False
+GROUP_FEED_TIMEOUT = 60 * 15
+ESTIMATED_COUNT_THRESHOLD = 10000
+ESTIMATED_COUNT_TIMEOUT = 60 * 15
+MODERATION_CHUNK_SIZE = 500
+MODERATION_BACKGROUND_THRESHOLD = 2000
+# Deleted posts and comments are purged by one job this long after
+# the first delete
+PURGE_DELAY = 60
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Uploads are named by content hash, see core/storage.py. For object
+# storage use 'core.storage.S3Storage' and point MEDIA_URL to the CDN.
+DEFAULT_FILE_STORAGE = 'core.storage.HashedFileSystemStorage'
+MEDIA_HASHED_PREFIXES = ('posts/',)
+MEDIA_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Files nothing refers to are removed after this delay, see core/media.py
+MEDIA_DELETE_DELAY = 60 * 60
+S3_STORAGE = {
+    'ENDPOINT_URL': 'http://127.0.0.1:9000',
+    'BUCKET': 'yatube-media',
+    'ACCESS_KEY': 'yatube',
+    'SECRET_KEY': 'yatube-secret',
+    'REGION': 'us-east-1',
+}
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
+# Stale-while-revalidate entries, see core/swr.py: how long a value is
+# served stale, how long one recomputation holds the lock, and how eagerly
+# values are refreshed before they expire.
+SWR_STALE_TIMEOUT = 60
+SWR_LOCK_TIMEOUT = 10
+SWR_BETA = 1.0
+# Thumbnails of post images, (geometry, options) as for get_thumbnail().
+# Pages show the first one, all are rendered ahead of time.
+POST_IMAGE_THUMBNAILS = (
+    ('960x339', {'crop': 'center', 'upscale': True}),
+)
+# Thumbnail entries in the default cache, kept in the database as well and
+# loaded a page at a time, see core/thumbnails.py.
+THUMBNAIL_KVSTORE = 'core.thumbnails.KVStore'
+# Task queue backend: 'eager', 'local' or 'database' (run manage.py runworker)
+TASKS_BACKEND = 'database'
+TASKS_WORKERS = 4
+TASKS_POLL_INTERVAL = 1
+TASKS_VISIBILITY_TIMEOUT = 60 * 10
+USER_CARD_TIMEOUT = 60 * 60
+NOTIFICATIONS_BATCH_SIZE = 500
+NOTIFICATIONS_UNREAD_TIMEOUT = 60 * 60
+# Pub/sub backend for live updates: 'local' or 'cache' (several workers
+# and the ASGI application, with a shared cache)
+PUBSUB_BACKEND = 'local'
+PUBSUB_BACKLOG = 100
+PUBSUB_RETENTION = 60 * 10
+SSE_HEARTBEAT = 15
+SSE_RETRY = 5
+SSE_MAX_DURATION = 60 * 5
+POST_CARD_CACHE = True
+POST_CARD_TIMEOUT = 60 * 60 * 24
+# Anonymous page shells, see core/pagecache.py; 0 turns the cache off.
+PAGE_CACHE_TIMEOUT = 60
+# Write limits per scope: (per user, per IP), see core/ratelimit.py
+RATELIMIT_ENABLE = True
+RATELIMITS = {
+    'posts': ('10/m', '30/m'),
+    'comments': ('30/m', '90/m'),
+    'follow': ('60/m', '180/m'),
+    'signup': (None, '10/h'),
+}
+IDEMPOTENCY_TIMEOUT = 60 * 10
+# A replay waits this long for the first request, then gets a 409
+IDEMPOTENCY_WAIT = 5
+# The claim of a running request outlives the longest request
+IDEMPOTENCY_PENDING_TIMEOUT = 60 * 2
+# Posts older than this are moved to the archive by manage.py archive_posts
+ARCHIVE_AFTER_DAYS = 365
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
+# The toolbar looks for APP_DIRS, the app_directories loader of
+# TEMPLATE_LOADERS finds its templates just as well.
+SILENCED_SYSTEM_CHECKS = ['debug_toolbar.W006']